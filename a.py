@@ -1,22 +1,22 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt  # Fixed import
 import seaborn as sns
 import altair as alt
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util  # Fixed import
+from sentence_transformers import util
 
 # Custom modules
-from forecast import load_data, train_forecast_model, predict_usage
-from analyzer import detect_anomalies
-from recommender import generate_recommendations
+from homewatt_cache import (
+    get_qa_pipeline, get_similarity_model, get_corpus_embeddings, analyze_upload, content_hash, retrieve_passages,
+    QA_MODEL, SIMILARITY_MODEL,
+)
 
 # Set page config
 st.set_page_config(page_title="HomeWatt", page_icon="💡", layout="wide")
 
 # Load NLP models
-qa_pipeline = pipeline("question-answering", model="distilbert-base-cased-distilled-squad")
-similarity_model = SentenceTransformer('all-MiniLM-L6-v2')  # Fixed class name
+# Cached across reruns: built once per process, not on every widget interaction
+qa_pipeline = get_qa_pipeline(QA_MODEL)
+similarity_model = get_similarity_model(SIMILARITY_MODEL)
 
 recommendations = [
     "Use energy-efficient appliances",
@@ -27,7 +27,9 @@ recommendations = [
     "Monitor real-time usage through HomeWatt Dashboard"
 ]
 
-corpus_embeddings = similarity_model.encode(recommendations, convert_to_tensor=True)
+corpus_embeddings = get_corpus_embeddings(SIMILARITY_MODEL, content_hash(recommendations), recommendations)
+
+results = None  # Set once a file is analyzed; the assistant uses its passages
 
 # Tabs for Navigation
 tab1, tab2 = st.tabs(["Dashboard", "AI Assistant"])
@@ -35,25 +37,23 @@ tab1, tab2 = st.tabs(["Dashboard", "AI Assistant"])
 # Tab1: Dashboard
 with tab1:
     st.title("HomeWatt - Energy Analytics Dashboard")
-    uploaded_file = st.file_uploader("Upload your energy usage CSV", type=["csv"])
+    uploaded_file = st.file_uploader("Upload your energy usage CSV or Parquet file", type=["csv", "parquet"])
 
     if uploaded_file:
-        df = load_data(uploaded_file)
-        if not {'timestamp', 'usage_kwh'}.issubset(df.columns):
+        # Parsing, aggregates, forecast and anomalies are cached per file content
+        file_bytes = uploaded_file.getvalue()
+        results = analyze_upload(content_hash(file_bytes), file_bytes)
+        if results is None:
             st.error("CSV must contain 'timestamp' and 'usage_kwh'")
             st.stop()
 
-        df['timestamp'] = pd.to_datetime(df['timestamp'])  # Fixed assignment
-        df['hour'] = df['timestamp'].dt.hour
-        df['day'] = df['timestamp'].dt.day_name()
-
         # Line chart
         st.subheader("📈 Usage Over Time")
-        st.line_chart(df.set_index('timestamp')['usage_kwh'])
+        st.line_chart(results['series'])
 
         # Hourly usage Bar Chart
         st.subheader("🕒 Hourly Energy Usage")
-        hourly_usage = df.groupby('hour')['usage_kwh'].sum().reset_index()
+        hourly_usage = results['hourly_usage']
         bar_chart = alt.Chart(hourly_usage).mark_bar().encode(
             x='hour:O',
             y='usage_kwh:Q',
@@ -63,7 +63,7 @@ with tab1:
 
         # Heatmap for day vs hour
         st.subheader("📊 Hour vs Day Usage Heatmap")
-        heatmap_data = df.pivot_table(index='day', columns='hour', values='usage_kwh', aggfunc='sum').fillna(0)
+        heatmap_data = results['heatmap_data']
         fig, ax = plt.subplots(figsize=(10, 5))
         sns.heatmap(heatmap_data, cmap="YlOrRd", annot=True, fmt=".1f", linewidths=0.3, ax=ax)  # Fixed cmap name
         plt.title("Average Usage by Day and Hour")
@@ -71,24 +71,20 @@ with tab1:
 
         # Rolling average
         st.subheader("📉 24-Hour Rolling Average")
-        df_sorted = df.sort_values('timestamp')
-        df_sorted['rolling_avg'] = df_sorted['usage_kwh'].rolling(window=24).mean()
-        st.line_chart(df_sorted.set_index('timestamp')[['usage_kwh', 'rolling_avg']])
+        st.line_chart(results['rolling'])
 
         # Forecasting
         st.subheader("🔮 Forecast for Next 24 Hours")
-        model = train_forecast_model(df)
-        forecast = predict_usage(model, list(range(24)))
-        st.line_chart(forecast)
+        st.line_chart(results['forecast'])
 
         # Anomaly detection
         st.subheader("🚨 Anomaly Detection")
-        anomalies = detect_anomalies(df)
+        anomalies = results['anomalies']
         st.dataframe(anomalies[anomalies['anomaly'] == -1])  # Fixed typo: st.datframes
 
         # Recommendations
         st.subheader("💡 Optimized Suggestions")
-        for rec in generate_recommendations(df):
+        for rec in results['recommendations']:
             st.info(rec)
     else:
         st.warning("⚠️ Please upload a CSV file to begin.")
@@ -99,13 +95,8 @@ with tab2:
     user_input = st.text_input("Ask HomeWatt anything about your energy usage:")
 
     if user_input:
-        # Static context (can be replaced with dynamic input)
-        energy_context = """
-        The air conditioner consumes around 2000W, washing machine 500W,
-        and kitchen appliances 800W. Major consumption is observed between 6PM and 10PM.
-        Usage can be optimized by turning off idle devices, shifting to LED lighting,
-        and scheduling heavy appliance usage during non-peak hours.
-        """
+        # Context: the passages about the uploaded data that best match the question
+        energy_context = " ".join(retrieve_passages(user_input, results["passages"] if results else None))
 
         answer = qa_pipeline(question=user_input, context=energy_context)
         query_emb = similarity_model.encode(user_input, convert_to_tensor=True)
@@ -1,6 +1,101 @@
+import json
+import os
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import IsolationForest
-def detect_anomalies(df):
-    daily =df.groupby(df['timestamp'].dt.date)['usage_kwh'].sum().reset_index()
-    model = IsolationForest(contamination=0.1)
-    daily['anomaly'] = model.fit_predict(daily[['usage_kwh']])
-    return daily
\ No newline at end of file
+ISOLATION_SEED = 42
+def fit_isolation_forest(daily, contamination=0.1):
+    # Fixed seed so reruns flag the same days; keep the returned model to re-score new data
+    return IsolationForest(contamination=contamination, random_state=ISOLATION_SEED).fit(daily[['usage_kwh']])
+def detect_anomalies(df, daily=None, model=None):
+    # Batch mode. daily: precomputed timestamp(date)/usage_kwh totals (EnergyFeatures.daily_totals)
+    # to skip the groupby; model: a fitted fit_isolation_forest() model to re-score without refitting
+    if daily is None:
+        daily = df.groupby(df['timestamp'].dt.date)['usage_kwh'].sum().reset_index()
+    else:
+        daily = daily.copy()
+    if model is None:
+        model = fit_isolation_forest(daily)
+    daily['anomaly'] = model.predict(daily[['usage_kwh']])
+    return daily
+class StreamingAnomalyDetector:
+    # Online mode. Each hour-of-day bucket keeps an exponentially weighted mean and variance.
+    # The first `warmup` readings of a bucket seed them with an exact running mean and sample
+    # variance (Welford), so the EW estimates start from a real spread instead of 0.
+    # After that a reading is scored against its bucket before it is added, and it is added
+    # clipped to +-clip standard deviations so a spike does not drag the baseline up (robust z-score).
+    # The variance uses a longer window (var_alpha) than the mean: a short-window spread estimate
+    # is noisy and turns ordinary readings into 3-sigma hits. It is bias-corrected by 1/(1 - var_alpha)
+    # because the EW update measures spread around the updated mean, not the prediction error.
+    # O(1) time per reading; the whole state is a few arrays and can be saved and resumed.
+    def __init__(self, alpha=0.1, threshold=3.0, clip=3.0, warmup=None, min_std=0.01, var_alpha=0.02):
+        self.alpha = alpha          # Weight of the newest reading in the bucket's mean
+        self.var_alpha = var_alpha  # Weight of the newest reading in the bucket's variance
+        self.threshold = threshold  # |z| above this is an anomaly
+        self.clip = clip
+        # Readings a bucket needs before it can flag anything; at least the EW window (1/alpha)
+        self.warmup = max(int(warmup or 0), int(np.ceil(1 / alpha)))
+        self.min_std = min_std      # kWh; keeps flat buckets from flagging tiny changes
+        self.mean = np.zeros(24)
+        self.var = np.zeros(24)
+        self.count = np.zeros(24, dtype=np.int64)
+        self.last_timestamp = None
+    def update(self, hour, value):
+        # Scores one reading, then folds it into its bucket; returns (zscore, is_anomaly)
+        mean, count = self.mean[hour], self.count[hour]
+        var = self.var[hour] / (1 - self.var_alpha) if count >= self.warmup else self.var[hour]
+        std = max(np.sqrt(var), self.min_std)
+        zscore = (value - mean) / std if count else 0.0
+        if count >= self.warmup:
+            clipped = min(max(value, mean - self.clip * std), mean + self.clip * std)
+            diff = clipped - mean
+            self.mean[hour] = mean + self.alpha * diff
+            self.var[hour] = (1 - self.var_alpha) * (self.var[hour] + self.var_alpha * diff * diff)
+        else:
+            # Welford: exact mean and population variance of the readings so far
+            new_mean = mean + (value - mean) / (count + 1)
+            self.var[hour] = (count * self.var[hour] + (value - mean) * (value - new_mean)) / (count + 1)
+            self.mean[hour] = new_mean
+            if count + 1 == self.warmup and count:
+                self.var[hour] *= (count + 1) / count  # Sample variance (n - 1) to hand over to the EW phase
+        self.count[hour] = count + 1
+        return zscore, count >= self.warmup and abs(zscore) > self.threshold
+    def score(self, series):
+        # Scores a timestamp-indexed usage series in order; readings at or before the last
+        # processed timestamp are skipped, so feeding overlapping data after a resume is safe
+        series = series.sort_index()
+        if self.last_timestamp is not None:
+            series = series[series.index > self.last_timestamp]
+        hours = series.index.hour.to_numpy()
+        values = series.to_numpy(dtype=np.float64)
+        zscores = np.zeros(len(values))
+        flags = np.zeros(len(values), dtype=bool)
+        for i in range(len(values)):
+            zscores[i], flags[i] = self.update(hours[i], values[i])
+        if len(values):
+            self.last_timestamp = series.index[-1]
+        return pd.DataFrame({'timestamp': series.index, 'usage_kwh': values, 'zscore': zscores, 'anomaly': np.where(flags, -1, 1)})
+    def to_dict(self):
+        return {
+            'params': {'alpha': self.alpha, 'threshold': self.threshold, 'clip': self.clip, 'warmup': self.warmup,
+                       'min_std': self.min_std, 'var_alpha': self.var_alpha},
+            'mean': self.mean.tolist(), 'var': self.var.tolist(), 'count': self.count.tolist(),
+            'last_timestamp': None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+        }
+    @classmethod
+    def from_dict(cls, state):
+        detector = cls(**state['params'])
+        detector.mean = np.array(state['mean'], dtype=np.float64)
+        detector.var = np.array(state['var'], dtype=np.float64)
+        detector.count = np.array(state['count'], dtype=np.int64)
+        detector.last_timestamp = None if state['last_timestamp'] is None else pd.Timestamp(state['last_timestamp'])
+        return detector
+    def save(self, path):
+        tmp_path = path + ".tmp"  # Write then swap, so a crash never leaves half a state file
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
\ No newline at end of file
@@ -1,117 +1,156 @@
-# === Import Required Libraries ===
-from fastapi import FastAPI, Request  # FastAPI is used to build APIs easily and quickly
-from pydantic import BaseModel         # For data validation and defining request body schemas
-from typing import List, Optional      # Used to define optional or list-type fields in models
-import pandas as pd                    # Pandas for data manipulation (CSV read/write, filtering, etc.)
-import random                          # Used to pick random recommendations
-import torch                           # PyTorch is a machine learning library
-from transformers import pipeline      # From HuggingFace Transformers: to load pre-trained ML models
-
-# === Create FastAPI app instance ===
-app = FastAPI()
-
-# === Load Dataset from CSV ===
-# This CSV stores all users' learning data like topic, score, feedback, etc.
-# In production, this should ideally be replaced by a database.
-data_path = "edtech_adaptive_learning_dataset.csv"
-df = pd.read_csv(data_path)  # Load data into a DataFrame for easy manipulation
-
-# === Load Pre-trained Sentiment Analysis Model ===
-# This model will classify feedback as Positive/Negative/Neutral
-sentiment_analyzer = pipeline("sentiment-analysis")
-
-# === Define the structure of the request using Pydantic ===
-
-# This model defines what fields are expected when a user submits learning data
-class UserLearningData(BaseModel):
-    user_id: int
-    topic: str
-    time_spent: int         # In minutes
-    quiz_score: int         # Score from a quiz on the topic
-    preference: str         # Visual / Text / Audio / Interactive
-    feedback: str           # Text feedback from user
-    rating: int             # User's rating for the content (1-5)
-
-# This model is used for the sentiment analysis endpoint (takes just feedback)
-class FeedbackText(BaseModel):
-    feedback: str
-
-# === API Endpoint 1: Submit Learning Data ===
-# Accepts learning data from a user and saves it to the CSV
-@app.post("/submit_data")
-def submit_learning_data(data: UserLearningData):
-    global df  # Access the global DataFrame
-    new_data = pd.DataFrame([data.dict()])  # Convert Pydantic model to DataFrame
-    df = pd.concat([df, new_data], ignore_index=True)  # Append to main DataFrame
-    df.to_csv(data_path, index=False)  # Save updated data back to CSV
-    return {"message": "Data submitted successfully."}
-
-# === API Endpoint 2: Get Topic Recommendations for a User ===
-@app.get("/get_recommendations/{user_id}")
-def get_recommendations(user_id: int):
-    user_data = df[df['user_id'] == user_id]  # Get data for this user
-    if user_data.empty:
-        return {"message": "User not found."}
-
-    # Get all topics the user has already learned
-    seen_topics = user_data['topic'].unique().tolist()
-
-    # Get all topics in dataset
-    all_topics = df['topic'].unique().tolist()
-
-    # Find topics the user hasn't learned yet
-    unseen_topics = list(set(all_topics) - set(seen_topics))
-
-    # If user has seen all topics, reset to all
-    if not unseen_topics:
-        unseen_topics = all_topics
-
-    # Randomly pick 3 recommendations from unseen topics
-    recommendations = random.sample(unseen_topics, k=min(3, len(unseen_topics)))
-    return {"recommended_topics": recommendations}
-
-# === API Endpoint 3: Analyze Feedback Sentiment ===
-@app.post("/analyze_feedback")
-def analyze_feedback(feedback: FeedbackText):
-    result = sentiment_analyzer(feedback.feedback)  # Use model to analyze sentiment
-    return {"feedback_sentiment": result[0]}  # Return label (Positive/Negative) and confidence score
-
-# === API Endpoint 4: Generate Adaptive Assessment ===
-@app.get("/adaptive_assessment/{user_id}")
-def adaptive_assessment(user_id: int):
-    user_data = df[df['user_id'] == user_id]  # Get the user's data
-    if user_data.empty:
-        return {"message": "User not found."}
-
-    avg_score = user_data['quiz_score'].mean()  # Calculate user's average quiz score
-
-    # Decide difficulty level based on user's average score
-    if avg_score >= 80:
-        difficulty = "Advanced"
-    elif avg_score >= 50:
-        difficulty = "Intermediate"
-    else:
-        difficulty = "Beginner"
-
-    # Simulated questions for each difficulty level
-    sample_questions = {
-        "Beginner": ["What is 2 + 2?", "Define variable."],
-        "Intermediate": ["Solve x: 2x + 5 = 15", "Explain slope in linear equations."],
-        "Advanced": ["Differentiate f(x) = x^2 + 3x", "What is an eigenvector?"]
-    }
-
-    questions = sample_questions[difficulty]  # Get questions based on level
-    return {
-        "assessment_level": difficulty,
-        "questions": questions
-    }
-
-# === API Endpoint 5: Chatbot (LLM Placeholder) ===
-# This is a placeholder for an AI tutor bot.
-# You can plug in any LLM like GPT, Mistral, Falcon here.
-@app.post("/chatbot")
-async def chatbot(request: Request):
-    data = await request.json()  # Read JSON request body
-    user_query = data.get("query")  # Extract the user's question
-    # For now, we return a placeholder message. You can connect this to a real LLM later.
-    return {"reply": f"You asked: '{user_query}'. This is a placeholder reply."}
+# === Import Required Libraries ===
+import time                            # Used to measure startup time
+_started_at = time.perf_counter()      # Taken before the heavy imports so the whole startup is measured
+
+from fastapi import FastAPI, Query, Request  # FastAPI is used to build APIs easily and quickly
+from pydantic import BaseModel, Field  # For data validation and defining request body schemas
+from typing import List, Optional      # Used to define optional or list-type fields in models
+import threading                       # Lock around index synchronization
+from learning_store import LearningEventStore  # Append-only storage for learning events
+from learning_index import UserTopicIndex       # Per-user topics and score totals, updated incrementally
+from topic_recommender import TopicRecommender  # Item-item recommender over a sparse user x topic matrix
+from sentiment_service import SentimentService  # Batched, cached sentiment inference shared with main.py
+from startup_budget import report_startup, WARM_MODELS  # Startup-time budget and model warmup switch
+
+# === Create FastAPI app instance ===
+app = FastAPI()
+
+# === Load Dataset from the Learning Event Store ===
+# Learning events (topic, score, feedback, etc.) live in an append-only SQLite store.
+# The original CSV is imported once when the store is created and is never rewritten.
+data_path = "edtech_adaptive_learning_dataset.csv"
+store = LearningEventStore("edtech_learning.db", seed_csv=data_path)
+
+# === Per-User Index and Topic Recommender ===
+# Seen topics and running quiz-score sums per user, plus a sparse user x topic
+# matrix with item-item similarity. Both are updated incrementally: before each read we pull
+# only the events committed since the last sync (by any worker).
+user_index = UserTopicIndex()
+recommender = TopicRecommender()
+sync_lock = threading.Lock()  # One sync at a time, so no event is applied twice
+MAX_RECOMMENDATIONS = 50  # Upper bound on k per user
+
+def sync_data():
+    with sync_lock:
+        rows, last_id = store.events_since(user_index.last_id)
+        if rows:
+            user_index.add_events(rows, last_id)
+            recommender.add_events(rows)
+
+sync_data()
+
+# === Load Pre-trained Sentiment Analysis Model ===
+# This model will classify feedback as Positive/Negative/Neutral
+# Concurrent requests are grouped into one forward pass and results are cached by text
+# The model is loaded on first use, so workers that only serve recommendations never load it
+sentiment_analyzer = SentimentService()
+
+# === Startup Hook ===
+# Set WARM_MODELS=1 to load the model before serving instead of on the first feedback request
+@app.on_event("startup")
+def on_startup():
+    if WARM_MODELS:
+        sentiment_analyzer.warmup()
+    report_startup("api", _started_at)
+
+# === Define the structure of the request using Pydantic ===
+
+# This model defines what fields are expected when a user submits learning data
+class UserLearningData(BaseModel):
+    user_id: int
+    topic: str
+    time_spent: int         # In minutes
+    quiz_score: int         # Score from a quiz on the topic
+    preference: str         # Visual / Text / Audio / Interactive
+    feedback: str           # Text feedback from user
+    rating: int             # User's rating for the content (1-5)
+
+# This model is used for the sentiment analysis endpoint (takes just feedback)
+class FeedbackText(BaseModel):
+    feedback: str
+
+# This model is used for the batch sentiment endpoint (takes a list of feedback texts)
+class FeedbackBatch(BaseModel):
+    feedbacks: List[str]
+
+# This model is used for the batch recommendation endpoint
+class UserBatch(BaseModel):
+    user_ids: List[int]
+    k: int = Field(3, ge=1, le=MAX_RECOMMENDATIONS)  # Number of topics to recommend per user
+
+# === API Endpoint 1: Submit Learning Data ===
+# Accepts learning data from a user and appends it to the store (O(1), durable once this returns)
+@app.post("/submit_data")
+def submit_learning_data(data: UserLearningData):
+    store.append(data.dict())  # Committed together with other submissions arriving at the same time
+    return {"message": "Data submitted successfully."}
+
+# === API Endpoint 2: Get Topic Recommendations for a User ===
+@app.get("/get_recommendations/{user_id}")
+def get_recommendations(user_id: int, k: int = Query(3, ge=1, le=MAX_RECOMMENDATIONS)):
+    sync_data()  # Apply events submitted since the last request
+    if not user_index.has_user(user_id):
+        return {"message": "User not found."}
+
+    # Top-k unseen topics most similar to what the user scored, spent time on and rated well
+    recommendations = recommender.recommend(user_id, k=k)
+    return {"recommended_topics": recommendations}
+
+# === API Endpoint 2b: Recommendations for Many Users in One Call ===
+@app.post("/get_recommendations/batch")
+def get_recommendations_batch(batch: UserBatch):
+    sync_data()  # Apply events submitted since the last request
+    results = recommender.recommend_many(batch.user_ids, k=batch.k)  # One sparse product for all users
+    return {"recommendations": {str(user_id): topics for user_id, topics in results.items()}}
+
+# === API Endpoint 3: Analyze Feedback Sentiment ===
+@app.post("/analyze_feedback")
+def analyze_feedback(feedback: FeedbackText):
+    result = sentiment_analyzer.analyze(feedback.feedback)  # Use model to analyze sentiment
+    return {"feedback_sentiment": result}  # Return label (Positive/Negative) and confidence score
+
+# === API Endpoint 3b: Analyze Many Feedback Texts at Once ===
+@app.post("/analyze_feedback/batch")
+def analyze_feedback_batch(batch: FeedbackBatch):
+    results = sentiment_analyzer.analyze_many(batch.feedbacks)  # One batched forward pass per chunk
+    return {"feedback_sentiments": results}
+
+# === API Endpoint 4: Generate Adaptive Assessment ===
+@app.get("/adaptive_assessment/{user_id}")
+def adaptive_assessment(user_id: int):
+    sync_data()  # Apply events submitted since the last request
+    if not user_index.has_user(user_id):
+        return {"message": "User not found."}
+
+    avg_score = user_index.average_score(user_id) or 0  # Running average of the user's quiz scores
+
+    # Decide difficulty level based on user's average score
+    if avg_score >= 80:
+        difficulty = "Advanced"
+    elif avg_score >= 50:
+        difficulty = "Intermediate"
+    else:
+        difficulty = "Beginner"
+
+    # Simulated questions for each difficulty level
+    sample_questions = {
+        "Beginner": ["What is 2 + 2?", "Define variable."],
+        "Intermediate": ["Solve x: 2x + 5 = 15", "Explain slope in linear equations."],
+        "Advanced": ["Differentiate f(x) = x^2 + 3x", "What is an eigenvector?"]
+    }
+
+    questions = sample_questions[difficulty]  # Get questions based on level
+    return {
+        "assessment_level": difficulty,
+        "questions": questions
+    }
+
+# === API Endpoint 5: Chatbot (LLM Placeholder) ===
+# This is a placeholder for an AI tutor bot.
+# You can plug in any LLM like GPT, Mistral, Falcon here.
+@app.post("/chatbot")
+async def chatbot(request: Request):
+    data = await request.json()  # Read JSON request body
+    user_query = data.get("query")  # Extract the user's question
+    # For now, we return a placeholder message. You can connect this to a real LLM later.
+    return {"reply": f"You asked: '{user_query}'. This is a placeholder reply."}
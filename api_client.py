@@ -0,0 +1,126 @@
+# Import necessary modules
+import json  # Stable cache keys for JSON bodies
+import os  # Timeouts, retries and cache TTL from the environment
+import threading  # Lock around the response cache
+import time  # Cache expiry
+from collections import OrderedDict  # Ordered dict gives us LRU ordering for free
+from concurrent.futures import ThreadPoolExecutor  # Concurrent fan-out of independent calls
+import requests  # HTTP client
+from requests.adapters import HTTPAdapter  # Connection pool per backend
+from urllib3.util.retry import Retry  # Retry with backoff on connection errors and 5xx
+
+# ----------------------------------------
+# === Configuration ===
+# ----------------------------------------
+
+CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 3))  # Seconds to open a connection
+READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", 30))       # Seconds to wait for a response
+RETRIES = int(os.environ.get("API_RETRIES", 2))                    # Extra attempts for idempotent calls
+CACHE_TTL = float(os.environ.get("API_CACHE_TTL", 60))             # Seconds a cached response stays fresh
+
+# ----------------------------------------
+# === Shared HTTP Client ===
+# ----------------------------------------
+
+class ApiClient:
+    """
+    HTTP client for one FastAPI backend, shared by the Streamlit frontends.
+    One pooled keep-alive session (no TCP setup per button press), connect/read timeouts,
+    retries with backoff for GET requests, a TTL cache per (method, path, params, body)
+    and fetch_many() to run independent calls in parallel.
+    Network failures come back as a 503 response, so callers only check status_code.
+    """
+
+    def __init__(self, base_url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=RETRIES,
+                 cache_ttl=CACHE_TTL, max_cache_entries=256, pool_size=16):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self._cache = OrderedDict()  # key -> (expires_at, response), oldest first
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=pool_size)
+
+        # POST is not retried by default (e.g. /submit_data must not be applied twice).
+        # 503 is not retried: the API sends it with Retry-After when a compute pool is full,
+        # and sleeping through that would freeze the page; it is shown to the user right away.
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(502, 504),
+                      allowed_methods=frozenset({"GET", "HEAD"}), respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, params=None, json_body=None, cache=None):
+        """
+        Sends one request. cache defaults to True for GET and False otherwise;
+        only 200 responses are cached.
+        """
+        cache = method == "GET" if cache is None else cache
+        key = (method, path, json.dumps(params, sort_keys=True, default=str),
+               json.dumps(json_body, sort_keys=True, default=str))
+        if cache:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry and entry[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return entry[1]
+
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", params=params,
+                                            json=json_body, timeout=self.timeout)
+        except requests.RequestException as exc:
+            return _failed_response(exc)
+
+        if cache and response.status_code == 200:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, response)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+        return response
+
+    def get(self, path, params=None, cache=None):
+        return self.request("GET", path, params=params, cache=cache)
+
+    def post(self, path, json_body=None, params=None, cache=None):
+        return self.request("POST", path, params=params, json_body=json_body, cache=cache)
+
+    def fetch_many(self, calls):
+        """
+        Runs independent calls in parallel: calls maps a name to (method, path, kwargs),
+        e.g. {"forecast": ("GET", "/forecast/P001", {})}. Returns name -> response.
+        """
+        futures = {name: self._pool.submit(self.request, method, path, **kwargs)
+                   for name, (method, path, kwargs) in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def clear_cache(self):
+        """Drops cached responses, e.g. after a write that changes what GETs return."""
+        with self._lock:
+            self._cache.clear()
+
+
+def _failed_response(exc):
+    # Stand-in response for timeouts and connection errors
+    response = requests.Response()
+    response.status_code = 503
+    response.reason = f"{type(exc).__name__}: {exc}"
+    response._content = json.dumps({"error": response.reason}).encode()
+    return response
+
+# ----------------------------------------
+# === One Client per Backend per Process ===
+# ----------------------------------------
+
+# Streamlit re-runs the page script on every interaction but keeps imported modules,
+# so clients stored here (and their open connections) survive reruns
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url):
+    with _clients_lock:
+        if base_url not in _clients:
+            _clients[base_url] = ApiClient(base_url)
+        return _clients[base_url]
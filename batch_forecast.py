@@ -0,0 +1,223 @@
+# Import necessary modules
+import argparse  # Command-line options for the batch job
+import functools  # Read the Prophet version once, on first use
+import importlib.metadata  # Read the Prophet version without importing it
+import os  # Read MongoDB URI from the environment
+import time  # Timing and sleeping between scheduled runs
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Fit products in parallel
+from datetime import datetime  # Timestamp each forecast run
+import pandas as pd  # Pandas for data manipulation
+from pymongo import MongoClient, ASCENDING, DESCENDING  # MongoDB access
+
+# ----------------------------------------
+# === Configuration ===
+# ----------------------------------------
+
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = "supply_chain_db"
+SALES_COLLECTION = "sales_data"
+FORECASTS_COLLECTION = "forecasts"
+
+# Number of days to forecast ahead
+FORECAST_PERIODS = 30
+
+# Fit on the most recent N days of each product's sales only (unset: full history).
+# Applied as a date range in the MongoDB query by the batch job and by main.py's on-demand fits.
+FORECAST_HISTORY_DAYS = int(os.environ["FORECAST_HISTORY_DAYS"]) if os.environ.get("FORECAST_HISTORY_DAYS") else None
+
+# ----------------------------------------
+# === Model Version ===
+# ----------------------------------------
+
+@functools.lru_cache(maxsize=1)
+def model_version():
+    """
+    Stored with every forecast row so readers know which model produced it.
+    Read on first use rather than at import, so importing this module (e.g. from main.py)
+    works without Prophet installed.
+    """
+    try:
+        return f"prophet-{importlib.metadata.version('prophet')}"
+    except importlib.metadata.PackageNotFoundError:
+        return "prophet-unknown"
+
+# ----------------------------------------
+# === Shared Fitting Logic ===
+# ----------------------------------------
+
+def fit_product_forecast(history, periods=FORECAST_PERIODS):
+    """
+    Fits Prophet on a product's sales history (list of dicts with 'date' and 'sales_quantity',
+    in date order as returned by load_product_history) and returns (model, forecast)
+    where forecast holds the next `periods` days only.
+    Used both by the batch job and by the on-demand fallback in main.py.
+    """
+    # Prophet is heavy to import, so only processes that actually fit pay for it
+    from prophet import Prophet
+
+    # Convert documents to a DataFrame (history is already sorted by date in MongoDB)
+    df = pd.DataFrame(history)
+    df["date"] = pd.to_datetime(df["date"])
+
+    # Prepare the data for Prophet (rename columns as required)
+    df_prophet = df[["date", "sales_quantity"]].rename(columns={
+        "date": "ds",    # Prophet expects 'ds' for datetime
+        "sales_quantity": "y"  # Prophet expects 'y' for the target variable
+    })
+
+    # Initialize and train the Prophet model
+    model = Prophet()
+    model.fit(df_prophet)
+
+    # Predict the next `periods` days and keep only those rows
+    future = model.make_future_dataframe(periods=periods)
+    forecast = model.predict(future)
+    forecast = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(periods).reset_index(drop=True)
+    return model, forecast
+
+def history_start(latest_date, days=FORECAST_HISTORY_DAYS):
+    """
+    First date of the fitting window that ends at a product's latest sale, or None when
+    the full history is used.
+    """
+    if not days or latest_date is None:
+        return None
+    return pd.to_datetime(latest_date) - pd.Timedelta(days=days - 1)
+
+def load_product_history(sales, product_id, start_date=None):
+    """
+    Loads the columns Prophet needs for one product, sorted by date inside MongoDB.
+    Served by the (product_id, date) index, so there is no collection scan or pandas sort;
+    start_date (see history_start) turns it into an index range scan over the recent days only.
+    """
+    query = {"product_id": product_id}
+    if start_date:
+        query["date"] = {"$gte": pd.to_datetime(start_date).to_pydatetime()}
+    cursor = sales.find(query, {"_id": 0, "date": 1, "sales_quantity": 1}).sort("date", ASCENDING)
+    return list(cursor)
+
+# ----------------------------------------
+# === Forecasts Collection Helpers ===
+# ----------------------------------------
+
+def ensure_forecast_indexes(forecasts):
+    """
+    Index used by readers to find the latest run for a product.
+    Returns the create_index result (awaitable when called with an async driver collection).
+    """
+    return forecasts.create_index([("product_id", ASCENDING), ("created_at", DESCENDING)])
+
+def store_forecast(forecasts, product_id, forecast, created_at):
+    """
+    Writes one run of forecast rows for a product, then removes older runs.
+    New rows are inserted before old ones are deleted, so readers never see an empty forecast.
+    """
+    docs = [
+        {
+            "product_id": product_id,
+            "ds": row.ds.to_pydatetime(),
+            "yhat": float(row.yhat),
+            "yhat_lower": float(row.yhat_lower),
+            "yhat_upper": float(row.yhat_upper),
+            "model_version": model_version(),
+            "created_at": created_at,
+        }
+        for row in forecast.itertuples(index=False)
+    ]
+    forecasts.insert_many(docs)
+    forecasts.delete_many({"product_id": product_id, "created_at": {"$ne": created_at}})
+    return len(docs)
+
+# ----------------------------------------
+# === Worker (runs in a separate process) ===
+# ----------------------------------------
+
+def forecast_one_product(product_id, created_at, periods=FORECAST_PERIODS):
+    """
+    Fits and stores the forecast for one product.
+    Each worker process opens its own MongoClient (clients must not be shared across fork).
+    Returns (product_id, rows_written, seconds).
+    """
+    start = time.perf_counter()
+    client = MongoClient(MONGO_URI)
+    try:
+        db = client[DB_NAME]
+
+        # Load only the columns Prophet needs, in date order, limited to the fitting window
+        start_date = None
+        if FORECAST_HISTORY_DAYS:
+            latest = db[SALES_COLLECTION].find_one({"product_id": product_id}, {"date": 1},
+                                                   sort=[("date", DESCENDING)])
+            start_date = history_start(latest["date"]) if latest else None
+        history = load_product_history(db[SALES_COLLECTION], product_id, start_date)
+        if not history:
+            return product_id, 0, time.perf_counter() - start
+
+        _, forecast = fit_product_forecast(history, periods)
+        rows = store_forecast(db[FORECASTS_COLLECTION], product_id, forecast, created_at)
+    finally:
+        client.close()
+    return product_id, rows, time.perf_counter() - start
+
+# ----------------------------------------
+# === Batch Run ===
+# ----------------------------------------
+
+def run_batch(workers=None, periods=FORECAST_PERIODS):
+    """
+    Forecasts every distinct product_id in sales_data across a process pool.
+    Returns a summary dict with counts and failures.
+    """
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    ensure_forecast_indexes(db[FORECASTS_COLLECTION])
+    product_ids = db[SALES_COLLECTION].distinct("product_id")
+    client.close()
+
+    # Same timestamp for the whole run so each product has exactly one current run
+    created_at = datetime.utcnow()
+    start = time.perf_counter()
+    done, failed = 0, {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(forecast_one_product, product_id, created_at, periods): product_id
+            for product_id in product_ids
+        }
+        for future in as_completed(futures):
+            product_id = futures[future]
+            try:
+                _, rows, seconds = future.result()
+                done += 1
+                print(f"✅ {product_id}: {rows} rows in {seconds:.2f}s")
+            except Exception as exc:  # One bad product should not stop the batch
+                failed[product_id] = str(exc)
+                print(f"❌ {product_id}: {exc}")
+
+    return {
+        "products": len(product_ids),
+        "succeeded": done,
+        "failed": failed,
+        "model_version": model_version(),
+        "created_at": created_at.isoformat(),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute Prophet forecasts for all products.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--periods", type=int, default=FORECAST_PERIODS, help="Days to forecast ahead")
+    parser.add_argument("--every-minutes", type=float, default=None,
+                        help="Repeat the batch on this schedule instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        summary = run_batch(workers=args.workers, periods=args.periods)
+        print(f"📦 Batch finished: {summary}")
+        if args.every_minutes is None:
+            break
+        time.sleep(args.every_minutes * 60)
@@ -0,0 +1,155 @@
+# Import necessary modules
+import asyncio  # Await pool results from async handlers
+import multiprocessing  # "spawn" start method for worker processes
+import os  # Pool sizes and queue limits from the environment
+import threading  # Guards the pending-task counter
+from concurrent.futures import ProcessPoolExecutor  # CPU-bound work off the event loop
+from concurrent.futures.process import BrokenProcessPool  # A worker died (e.g. killed for memory)
+
+# ----------------------------------------
+# === Configuration ===
+# ----------------------------------------
+
+# Prophet fits and transformer inference get separate pools, so a burst of long fits
+# never delays sentiment requests (and vice versa)
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", 2))
+FORECAST_MAX_QUEUE = int(os.environ.get("FORECAST_MAX_QUEUE", 8))  # Waiting fits before 503
+NLP_WORKERS = int(os.environ.get("NLP_WORKERS", 1))
+NLP_MAX_QUEUE = int(os.environ.get("NLP_MAX_QUEUE", 64))           # Waiting batches/texts before 503
+
+# ----------------------------------------
+# === Bounded Process Pool ===
+# ----------------------------------------
+
+class PoolBusy(Exception):
+    """
+    Raised instead of queueing when a pool already has its maximum number of tasks.
+    main.py turns it into a 503 with a Retry-After header.
+    """
+
+    def __init__(self, pool_name, retry_after=5):
+        super().__init__(f"{pool_name} is busy, retry in {retry_after}s")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+class ComputePool:
+    """
+    ProcessPoolExecutor with a cap on queued work. At most `workers` tasks run and at most
+    `max_queue` more wait; anything beyond that is rejected right away with PoolBusy, so
+    overload turns into fast 503s instead of ever-growing latency.
+    Workers are started with "spawn": the API process has threads (sentiment batcher,
+    driver connection pools) that must not be copied into a forked child.
+    """
+
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self._executor = self._new_executor()
+        self._pending = 0  # Running + queued tasks
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.restarts = 0
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _restart(self, broken):
+        """
+        Replaces a broken executor (a worker process died, e.g. killed for running out of memory).
+        A broken ProcessPoolExecutor rejects every later submit, so without this the pool would
+        stay unusable until the API restarts. Only the first caller that sees `broken` replaces it.
+        """
+        with self._lock:
+            if self._executor is broken:
+                self._executor = self._new_executor()
+                self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn, *args):
+        """
+        Submits a task and returns a concurrent.futures.Future; raises PoolBusy when full.
+        A task lost to a crashed worker also ends in PoolBusy (a 503), and the executor is
+        replaced so later calls work again. Safe to call from any thread.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusy(self.name)
+            self._pending += 1
+            executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._done(None)
+            self._restart(executor)
+            raise PoolBusy(self.name)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        future.add_done_callback(lambda done: self._check_broken(done, executor))
+        return future
+
+    def _check_broken(self, future, executor):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._restart(executor)
+
+    def call(self, fn, *args):
+        """
+        Blocking version of submit() for worker threads; raises PoolBusy if the worker crashed.
+        """
+        try:
+            return self.submit(fn, *args).result()
+        except BrokenProcessPool:
+            raise PoolBusy(self.name)
+
+    async def run(self, fn, *args):
+        """
+        Async version of submit(): awaits the result without blocking the event loop.
+        Raises PoolBusy (503) if the worker running the task crashed.
+        """
+        try:
+            return await asyncio.wrap_future(self.submit(fn, *args))
+        except BrokenProcessPool:
+            raise PoolBusy(self.name)
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "pending": self._pending,
+                    "max_pending": self.max_pending, "rejected": self.rejected, "restarts": self.restarts}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# ----------------------------------------
+# === Worker Functions (run inside the pool processes) ===
+# ----------------------------------------
+
+def fit_forecast(history, periods):
+    """
+    Fits Prophet on one product's history and returns only the forecast frame.
+    The fitted model stays in the worker: it is large and is not needed by the API.
+    """
+    from batch_forecast import fit_product_forecast  # Imported in the worker, not at API startup
+    _, forecast = fit_product_forecast(history, periods)
+    return forecast
+
+
+_sentiment_pipeline = None  # One model per NLP worker process, loaded on its first batch
+
+
+def score_texts(texts):
+    """
+    Runs one sentiment forward pass over a list of (already normalized) texts.
+    """
+    global _sentiment_pipeline
+    if _sentiment_pipeline is None:
+        from sentiment_service import load_sentiment_pipeline
+        _sentiment_pipeline = load_sentiment_pipeline()
+    return _sentiment_pipeline(list(texts), batch_size=len(texts), truncation=True) if texts else []
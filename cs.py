@@ -1,46 +1,218 @@
-# === Import Required Libraries ===
-import pandas as pd  # For data manipulation (reading CSV, working with DataFrames)
-from sklearn.feature_extraction.text import TfidfVectorizer  # To convert text to numeric form using TF-IDF
-from sklearn.metrics.pairwise import cosine_similarity  # To measure similarity between user query and resources
-
-# === Step 1: Load Learning Resources Dataset ===
-# This CSV contains details of various learning resources like title, subject, difficulty, description, etc.
-df = pd.read_csv("learning_resources_large.csv")
-
-# === Step 2: Prepare Text for TF-IDF ===
-# Combine relevant columns (title, description, subject) into one text field to use for similarity comparison
-df['text'] = df['title'] + " " + df['description'] + " " + df['subject']
-
-# === Step 3: Convert Text Data into TF-IDF Vectors ===
-# This converts each resource's text into a numeric vector while ignoring common English stop words
-vectorizer = TfidfVectorizer(stop_words='english')
-tfidf_matrix = vectorizer.fit_transform(df['text'])  # Each row corresponds to a resource
-
-# === Step 4: Define Function to Recommend Resources Based on User's Query ===
-def get_recommendations_from_query(user_query, top_n=5):
-    """
-    Given a user's free-text query, return top N most relevant learning resources using cosine similarity.
-    """
-    # Convert user query into TF-IDF vector using the same vectorizer
-    query_vector = vectorizer.transform([user_query])
-    
-    # Calculate cosine similarity between user query and all resources
-    similarities = cosine_similarity(query_vector, tfidf_matrix).flatten()
-    
-    # Get indices of top N most similar resources
-    top_indices = similarities.argsort()[-top_n:][::-1]
-    
-    # Return selected rows with useful columns (title, url, subject, etc.) as a list of dictionaries
-    return df[['title', 'url', 'subject', 'difficulty', 'description']].iloc[top_indices].to_dict(orient='records')
-
-# === Step 5: Run the Script as a Test ===
-if __name__ == "__main__":
-    # Example user query
-    query = "I want to learn about algebra or math equations"
-
-    # Get top 5 recommended resources based on the query
-    results = get_recommendations_from_query(query)
-
-    # Print the recommendations
-    for res in results:
-        print(res)
+# === Import Required Libraries ===
+import os  # For checking whether a saved index exists and is up to date
+import pickle  # To save/load the fitted vectorizer (vocabulary + idf weights)
+import numpy as np  # For memory-mapped arrays and vectorized top-k
+import pandas as pd  # For data manipulation (reading CSV, working with DataFrames)
+import scipy.sparse as sp  # Sparse TF-IDF matrices
+from sklearn.feature_extraction.text import TfidfVectorizer  # To convert text to numeric form using TF-IDF
+
+# === Step 1: Settings ===
+# This CSV contains details of various learning resources like title, subject, difficulty, description, etc.
+DATA_PATH = "learning_resources_large.csv"
+INDEX_DIR = "tfidf_index"  # Folder where the fitted vectorizer and TF-IDF matrix are saved
+RESULT_COLUMNS = ['title', 'url', 'subject', 'difficulty', 'description']
+
+# Combine relevant columns (title, description, subject) into one text field to use for similarity comparison
+def resource_text(resources):
+    return resources['title'] + " " + resources['description'] + " " + resources['subject']
+
+# Writes a file next to its final path and then swaps it in, so a process that has the old
+# file memory-mapped keeps reading consistent data and a crash never leaves a half-written file
+def _replace_file(path, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+# === Step 2: Persistent TF-IDF Index ===
+# The TF-IDF matrix is stored term-major ("postings": one row per word, listing the resources
+# that contain it), with each row sorted by weight. A query only touches the postings of its
+# own words, so cost depends on how common the query words are, not on the catalog size.
+# Limiting each word to its top `max_postings` resources gives a faster approximate search.
+# New resources go to a small in-memory segment and removals are tombstones, so neither needs
+# a refit; compact() merges them into the main postings (still without refitting).
+class TfidfIndex:
+
+    def __init__(self, vectorizer, postings, resources, deleted=None):
+        self.vectorizer = vectorizer  # Fitted TfidfVectorizer (vocabulary and idf are fixed)
+        self.postings = postings      # CSR matrix, words x resources, rows sorted by weight
+        self.resources = resources.reset_index(drop=True)
+        n_docs = postings.shape[1]
+        self.extra = sp.csr_matrix((0, postings.shape[0]), dtype=np.float32)  # Added resources x words
+        self.deleted = np.zeros(n_docs, dtype=bool) if deleted is None else np.asarray(deleted, dtype=bool).copy()
+        self._truncated = {}          # max_postings -> truncated postings matrix
+        self.generation = 0           # Bumped whenever compact() renumbers resource positions
+
+    # --- Building and saving ---
+
+    @classmethod
+    def build(cls, resources):
+        """Fits TF-IDF on the resources (the only place a fit happens)."""
+        # This converts each resource's text into a numeric vector while ignoring common English stop words
+        vectorizer = TfidfVectorizer(stop_words='english', dtype=np.float32)
+        doc_matrix = vectorizer.fit_transform(resource_text(resources))  # Each row corresponds to a resource
+        vectorizer.stop_words_ = None  # Only needed for introspection; keeps the saved file small
+        return cls(vectorizer, cls._to_postings(doc_matrix), resources)
+
+    @staticmethod
+    def _to_postings(doc_matrix):
+        # Transpose to words x resources and sort each word's entries by weight (highest first)
+        postings = doc_matrix.T.tocsr()
+        row_ids = np.repeat(np.arange(postings.shape[0]), np.diff(postings.indptr))
+        order = np.lexsort((-postings.data, row_ids))
+        postings = sp.csr_matrix(
+            (postings.data[order], postings.indices[order], postings.indptr), shape=postings.shape
+        )
+        postings.has_sorted_indices = False  # Sorted by weight, not by resource position
+        return postings
+
+    def save(self, index_dir=INDEX_DIR):
+        """Writes the vectorizer, the postings arrays and the resource table to index_dir."""
+        self.compact()
+        os.makedirs(index_dir, exist_ok=True)
+        _replace_file(os.path.join(index_dir, "vectorizer.pkl"), lambda f: pickle.dump(self.vectorizer, f))
+        _replace_file(os.path.join(index_dir, "data.npy"), lambda f: np.save(f, self.postings.data))
+        _replace_file(os.path.join(index_dir, "indices.npy"), lambda f: np.save(f, self.postings.indices))
+        _replace_file(os.path.join(index_dir, "indptr.npy"), lambda f: np.save(f, self.postings.indptr))
+        _replace_file(os.path.join(index_dir, "deleted.npy"), lambda f: np.save(f, self.deleted))
+        # Written last: load_or_build_index uses its timestamp to decide whether the index is current
+        _replace_file(os.path.join(index_dir, "resources.pkl"), lambda f: self.resources.to_pickle(f))
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR):
+        """Maps a saved index from disk (no refit, postings are memory-mapped read-only)."""
+        with open(os.path.join(index_dir, "vectorizer.pkl"), "rb") as f:
+            vectorizer = pickle.load(f)
+        data = np.load(os.path.join(index_dir, "data.npy"), mmap_mode="r")
+        indices = np.load(os.path.join(index_dir, "indices.npy"), mmap_mode="r")
+        indptr = np.load(os.path.join(index_dir, "indptr.npy"), mmap_mode="r")
+        resources = pd.read_pickle(os.path.join(index_dir, "resources.pkl"))
+        shape = (len(vectorizer.vocabulary_), len(resources))
+        postings = sp.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+        postings.has_sorted_indices = False
+        return cls(vectorizer, postings, resources, np.load(os.path.join(index_dir, "deleted.npy")))
+
+    # --- Incremental updates (no refit) ---
+
+    def add_resources(self, new_resources):
+        """Adds resources using the existing vocabulary (words unseen at fit time are ignored)."""
+        vectors = self.vectorizer.transform(resource_text(new_resources))
+        self.extra = sp.vstack([self.extra, vectors], format="csr")
+        self.resources = pd.concat([self.resources, new_resources], ignore_index=True)
+        self.deleted = np.concatenate([self.deleted, np.zeros(len(new_resources), dtype=bool)])
+
+    def remove_resources(self, urls):
+        """Hides resources by URL; they are dropped for good on the next compact()."""
+        self.deleted |= self.resources['url'].isin(urls).to_numpy()
+
+    def compact(self):
+        """Merges added resources into the postings and drops removed ones."""
+        if self.extra.shape[0] == 0 and not self.deleted.any():
+            return
+        doc_matrix = sp.vstack([self.postings.T.tocsr(), self.extra], format="csr")
+        keep = ~self.deleted
+        self.postings = self._to_postings(doc_matrix[keep])
+        self.resources = self.resources[keep].reset_index(drop=True)
+        self.extra = sp.csr_matrix((0, self.postings.shape[0]), dtype=np.float32)
+        self.deleted = np.zeros(len(self.resources), dtype=bool)
+        self._truncated = {}
+        self.generation += 1  # Positions shifted: anything aligned to the old rows is stale
+
+    # --- Searching ---
+
+    def _postings_for(self, max_postings):
+        # Keeps only the top `max_postings` resources per word (rows are already weight-sorted)
+        if max_postings is None:
+            return self.postings
+        if max_postings not in self._truncated:
+            indptr = np.asarray(self.postings.indptr)
+            lengths = np.diff(indptr)
+            rank = np.arange(indptr[-1]) - np.repeat(indptr[:-1], lengths)
+            keep = rank < max_postings
+            new_indptr = np.concatenate([[0], np.cumsum(np.minimum(lengths, max_postings))])
+            self._truncated[max_postings] = sp.csr_matrix(
+                (np.asarray(self.postings.data)[keep], np.asarray(self.postings.indices)[keep], new_indptr),
+                shape=self.postings.shape,
+            )
+        return self._truncated[max_postings]
+
+    def score_many(self, queries, max_postings=None):
+        """
+        Returns a sparse queries x resources matrix of cosine similarities (one sparse matmul).
+        Vectors are L2-normalized, so the dot product is cosine similarity.
+        Removed resources are still present; search_many filters them out.
+        """
+        query_matrix = self.vectorizer.transform(queries)
+        scores = query_matrix @ self._postings_for(max_postings)  # Only resources sharing a word
+        if self.extra.shape[0]:
+            scores = sp.hstack([scores, query_matrix @ self.extra.T], format="csr")
+        return scores.tocsr()
+
+    def search_many(self, queries, top_n=5, max_postings=None):
+        """
+        Returns, per query, the positions of the top_n resources by cosine similarity.
+        """
+        return self.top_positions(self.score_many(queries, max_postings), top_n)
+
+    def top_positions(self, scores, top_n=5):
+        """
+        Per row of a score_many() matrix, the positions of the top_n live resources.
+        """
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            positions, values = scores.indices[start:end], scores.data[start:end]
+            alive = ~self.deleted[positions]
+            positions, values = positions[alive], values[alive]
+            # argpartition picks the best top_n without sorting every candidate
+            if len(values) > top_n:
+                best = np.argpartition(-values, top_n - 1)[:top_n]
+                positions, values = positions[best], values[best]
+            results.append(positions[np.argsort(-values)])
+        return results
+
+    def records(self, positions):
+        return self.resources[RESULT_COLUMNS].iloc[positions].to_dict(orient='records')
+
+# === Step 3: Load the Saved Index (or Build It Once) ===
+def load_or_build_index(data_path=DATA_PATH, index_dir=INDEX_DIR):
+    saved = os.path.join(index_dir, "resources.pkl")
+    if os.path.exists(saved) and os.path.getmtime(saved) >= os.path.getmtime(data_path):
+        return TfidfIndex.load(index_dir)
+    index = TfidfIndex.build(pd.read_csv(data_path))
+    index.save(index_dir)
+    return index
+
+index = load_or_build_index()
+
+# === Step 4: Define Functions to Recommend Resources Based on User's Query ===
+def get_recommendations_from_query(user_query, top_n=5, max_postings=None, mode="tfidf"):
+    """
+    Given a user's free-text query, return top N most relevant learning resources using cosine similarity.
+    Pass max_postings (e.g. 1000) for a faster approximate search on large catalogs.
+    mode: "tfidf" (word matching), "semantic" (sentence embeddings) or "hybrid" (both combined).
+    """
+    return get_recommendations_for_queries([user_query], top_n, max_postings, mode)[0]
+
+def get_recommendations_for_queries(queries, top_n=5, max_postings=None, mode="tfidf"):
+    """
+    Batch version: scores many queries in one sparse matrix product.
+    """
+    if mode == "tfidf":
+        return [index.records(positions) for positions in index.search_many(queries, top_n, max_postings)]
+
+    # Embedding modes load the sentence-transformer model, so they are imported only when used
+    import semantic_search
+    return semantic_search.get_recommendations_for_queries(queries, top_n, mode)
+
+# === Step 5: Run the Script as a Test ===
+if __name__ == "__main__":
+    # Example user query
+    query = "I want to learn about algebra or math equations"
+
+    # Get top 5 recommended resources based on the query
+    results = get_recommendations_from_query(query)
+
+    # Print the recommendations
+    for res in results:
+        print(res)
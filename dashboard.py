@@ -1,11 +1,12 @@
 # === Required Libraries ===
 import streamlit as st            # For building the frontend web app
-import requests                   # To make API requests to the FastAPI backend
+from api_client import get_client  # Pooled, cached HTTP client for the FastAPI backend
 import pandas as pd              # For data handling (like JSON to dataframe)
 import plotly.express as px      # For interactive plotting
 
 # === Configuration ===
 FASTAPI_URL = "http://localhost:8000"  # URL of the FastAPI backend (can also be hosted on cloud)
+client = get_client(FASTAPI_URL)       # Shared across reruns: keep-alive connections and cached responses
 
 # Set the layout and page title of your Streamlit app
 st.set_page_config(page_title="📦 Supply Chain Analytics", layout="wide")
@@ -22,7 +23,7 @@ if selected_tab == "📈 Demand Forecast":
 
     if st.button("Get Forecast"):                    # Button to trigger forecast request
         # Make a GET request to FastAPI backend to get forecast data for the given product
-        res = requests.get(f"{FASTAPI_URL}/forecast/{product_id}")
+        res = client.get(f"/forecast/{product_id}")
         
         if res.status_code == 200:
             data = pd.DataFrame(res.json())          # Convert response JSON to DataFrame
@@ -44,7 +45,7 @@ elif selected_tab == "📦 Inventory Optimizer":
 
     if st.button("Get Inventory Suggestion"):
         # Call FastAPI route to get optimized inventory numbers
-        res = requests.get(f"{FASTAPI_URL}/inventory_optimize/{product_id}")
+        res = client.get(f"/inventory_optimize/{product_id}")
         
         if res.status_code == 200:
             result = res.json()                      # Parse JSON result
@@ -69,7 +70,7 @@ elif selected_tab == "🧠 Market Sentiment":
 
     if st.button("Analyze"):                         # Trigger analysis
         # Send POST request to FastAPI NLP endpoint with user input
-        res = requests.post(f"{FASTAPI_URL}/market_analysis", params={"text": input_text})
+        res = client.post("/market_analysis", params={"text": input_text}, cache=True)
         
         if res.status_code == 200:
             result = res.json()                      # Get JSON response
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class EnergyFeatures:
+    # Everything the HomeWatt dashboard draws, computed once per upload
+    def __init__(self, series, rolling, hourly_totals, day_hour, daily_totals, mean_usage, max_usage,
+                 device_totals=None):
+        self.series = series                # usage_kwh per timestamp (all devices summed)
+        self.rolling = rolling              # usage_kwh and rolling_avg (24h window) per timestamp
+        self.hourly_totals = hourly_totals  # hour, usage_kwh
+        self.day_hour = day_hour            # day x hour matrix of usage sums
+        self.daily_totals = daily_totals    # timestamp (date), usage_kwh
+        self.mean_usage = mean_usage
+        self.max_usage = max_usage
+        self.device_totals = device_totals  # usage_kwh per device, largest first (None without a device column)
+
+
+class FeatureAccumulator:
+    # Running aggregates over typed chunks from forecast.load_data. Hour-of-day, day x hour
+    # and summary stats are fixed-size arrays; the time series is kept as per-bucket totals,
+    # so memory grows with the time span covered (at `freq` resolution), not with row count.
+    # Daily totals and the rolling mean are derived from those buckets in result().
+    def __init__(self, freq=None, merge_every=16):
+        self.freq = freq                    # e.g. "h" to bucket the series hourly; None keeps raw timestamps
+        self.merge_every = merge_every      # Partial series are merged after this many chunks
+        self.hourly = np.zeros(24)
+        self.day_hour = np.zeros(7 * 24)
+        self.day_counts = np.zeros(7, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = -np.inf
+        self.parts = []
+        self.devices = None
+
+    def add(self, chunk):
+        # Each aggregate is an np.bincount over integer codes: one pass over the chunk, no copies
+        raw_usage = chunk['usage_kwh'].to_numpy(dtype=np.float64)
+        usage = np.nan_to_num(raw_usage)  # Missing readings count as 0, like groupby().sum()
+        hour = chunk['hour'].to_numpy(dtype=np.int64)
+        day = chunk['day'].cat.codes.to_numpy(dtype=np.int64)
+
+        self.hourly += np.bincount(hour, weights=usage, minlength=24)
+        self.day_hour += np.bincount(day * 24 + hour, weights=usage, minlength=7 * 24)
+        self.day_counts += np.bincount(day, minlength=7)
+        valid = raw_usage[~np.isnan(raw_usage)]
+        if len(valid):
+            self.count += len(valid)
+            self.total += float(valid.sum())
+            self.max = max(self.max, float(valid.max()))
+
+        if 'device' in chunk.columns:
+            # Device is categorical, so this sums over its integer codes
+            totals = pd.Series(usage, index=chunk.index).groupby(chunk['device'], observed=True).sum()
+            totals.index = totals.index.astype(str)
+            self.devices = totals if self.devices is None else self.devices.add(totals, fill_value=0.0)
+
+        # Per-timestamp (or per-bucket) totals; several devices can report at the same timestamp
+        timestamps = chunk['timestamp'] if self.freq is None else chunk['timestamp'].dt.floor(self.freq)
+        stamps, stamp_codes = np.unique(timestamps.to_numpy(), return_inverse=True)
+        self.parts.append(pd.Series(np.bincount(stamp_codes, weights=usage, minlength=len(stamps)), index=stamps))
+        if len(self.parts) >= self.merge_every:
+            self.parts = [self._merged_series()]
+
+    def _merged_series(self):
+        # Chunks may overlap in time (unsorted files), so buckets are summed, which also sorts them
+        if not self.parts:
+            return pd.Series([], index=pd.DatetimeIndex([]), dtype=np.float64)
+        return pd.concat(self.parts).groupby(level=0).sum()
+
+    def result(self):
+        merged = self._merged_series()
+        series = pd.Series(merged.to_numpy(dtype=np.float32), index=pd.DatetimeIndex(merged.index, name='timestamp'),
+                           name='usage_kwh')
+
+        # Daily totals from the sorted series
+        dates, date_codes = np.unique(series.index.to_numpy().astype('datetime64[D]'), return_inverse=True)
+        daily = np.bincount(date_codes, weights=merged.to_numpy(dtype=np.float64), minlength=len(dates))
+
+        rolling = series.to_frame()
+        rolling['rolling_avg'] = series.rolling('24h').mean()
+
+        present = self.day_counts > 0
+        return EnergyFeatures(
+            series=series,
+            rolling=rolling,
+            hourly_totals=pd.DataFrame({'hour': np.arange(24), 'usage_kwh': self.hourly.astype(np.float32)}),
+            day_hour=pd.DataFrame(self.day_hour.reshape(7, 24)[present],
+                                  index=pd.Index(np.array(DAYS)[present], name='day'),
+                                  columns=pd.Index(np.arange(24), name='hour')),
+            daily_totals=pd.DataFrame({'timestamp': pd.to_datetime(dates).date, 'usage_kwh': daily}),
+            mean_usage=self.total / self.count if self.count else 0.0,
+            max_usage=self.max if self.count else 0.0,
+            device_totals=None if self.devices is None else self.devices.sort_values(ascending=False),
+        )
+
+
+def compute_features(df):
+    # Expects the typed frame from forecast.load_data (int8 hour, categorical day, float32 usage)
+    accumulator = FeatureAccumulator()
+    accumulator.add(df)
+    return accumulator.result()
+
+
+def accumulate_features(chunks, freq="h"):
+    # Bounded-memory version for chunked input (forecast.load_data(path, chunksize=...)).
+    # The series is bucketed at `freq` so a year of per-minute readings stays at 8760 points.
+    accumulator = FeatureAccumulator(freq=freq)
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.result()
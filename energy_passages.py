@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# Short factual passages about one upload, for the HomeWatt assistant. Each passage is one
+# or two sentences, so whatever top-k the retriever picks keeps the QA context short.
+
+# Always available, so general questions still get an answer (and the assistant works before an upload)
+GENERAL_PASSAGES = [
+    "An air conditioner typically draws around 2000 W, a washing machine 500 W and kitchen appliances 800 W.",
+    "Usage can be reduced by turning off idle devices, switching to LED lighting and "
+    "scheduling heavy appliances outside peak hours.",
+]
+
+
+def _hour(hour):
+    return f"{int(hour):02d}:00"
+
+
+def build_passages(features, anomalies=None, forecast=None, max_items=3):
+    """Turns EnergyFeatures (plus the dashboard's anomalies and forecast) into passages."""
+    series = features.series
+    if series.empty:
+        return list(GENERAL_PASSAGES)
+    passages = []
+
+    daily = features.daily_totals
+    total = float(daily['usage_kwh'].sum())
+    passages.append(
+        f"Total usage was {total:.1f} kWh from {series.index.min():%Y-%m-%d} to {series.index.max():%Y-%m-%d}, "
+        f"an average of {total / max(len(daily), 1):.1f} kWh per day."
+    )
+    passages.append(
+        f"The average reading was {features.mean_usage:.2f} kWh and the highest single reading was "
+        f"{features.max_usage:.2f} kWh."
+    )
+
+    # Peak and off-peak hours of the day
+    hourly = features.hourly_totals.set_index('hour')['usage_kwh']
+    peak = hourly.nlargest(max_items)
+    quiet = hourly[hourly > 0].nsmallest(max_items)
+    share = 100 * float(peak.sum()) / total if total else 0.0
+    passages.append(
+        f"Peak usage hours are {', '.join(_hour(h) for h in peak.index)}, "
+        f"which account for {share:.0f}% of consumption."
+    )
+    if len(quiet):
+        passages.append(f"The lowest usage (off-peak) hours are {', '.join(_hour(h) for h in quiet.index)}.")
+
+    # Days
+    top_days = daily.nlargest(max_items, 'usage_kwh')
+    passages.append(
+        "The highest usage days were "
+        + ", ".join(f"{row.timestamp} ({row.usage_kwh:.1f} kWh)" for row in top_days.itertuples()) + "."
+    )
+    weekdays = features.day_hour.sum(axis=1)
+    if len(weekdays) > 1:
+        passages.append(
+            f"The busiest day of the week is {weekdays.idxmax()} with {weekdays.max():.1f} kWh "
+            f"and the quietest is {weekdays.idxmin()} with {weekdays.min():.1f} kWh."
+        )
+
+    # Devices
+    if features.device_totals is not None and total:
+        for device, usage in features.device_totals.head(max_items + 2).items():
+            passages.append(f"The {device} used {usage:.1f} kWh, {100 * usage / total:.0f}% of total consumption.")
+
+    # Anomalies (either detector: both return timestamp / usage_kwh / anomaly == -1)
+    if anomalies is not None:
+        flagged = anomalies[anomalies['anomaly'] == -1]
+        if len(flagged):
+            worst = flagged.nlargest(max_items, 'usage_kwh')
+            passages.append(
+                f"Unusual usage was detected {len(flagged)} times, for example at "
+                + ", ".join(f"{row.timestamp} ({row.usage_kwh:.2f} kWh)" for row in worst.itertuples()) + "."
+            )
+        else:
+            passages.append("No unusual usage was detected in the uploaded data.")
+
+    # Forecast (UsageForecaster returns a timestamped series; the fallback model an array by hour)
+    if forecast is not None:
+        values = np.asarray(forecast, dtype=np.float64)
+        if isinstance(forecast, pd.Series) and isinstance(forecast.index, pd.DatetimeIndex):
+            peak_at = forecast.idxmax().hour
+        else:
+            peak_at = int(values.argmax())
+        passages.append(
+            f"Usage over the next {len(values)} hours is forecast at {values.sum():.1f} kWh, "
+            f"peaking around {_hour(peak_at)}."
+        )
+
+    return passages + GENERAL_PASSAGES
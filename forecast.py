@@ -2,18 +2,154 @@ import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 import numpy as np
-def load_data(path="data/sample_energy.csv"):
-    df = pd.read_csv(path, parse_dates=["timestamp"])
-    df['hour'] = df['timestamp'].dt.hour
-    df['day'] = df['timestamp'].dt.day_name()
+from energy_features import DAYS
+USAGE_DTYPES = {"usage_kwh": "float32", "device": "category"}
+def _prepare(df):
+    # Compact dtypes; hour/day are derived from the parsed timestamps
+    if 'timestamp' not in df.columns or 'usage_kwh' not in df.columns:
+        raise ValueError("Energy data must contain 'timestamp' and 'usage_kwh' columns")
+    if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['usage_kwh'] = df['usage_kwh'].astype('float32')
+    df['hour'] = df['timestamp'].dt.hour.astype('int8')
+    df['day'] = pd.Categorical.from_codes(df['timestamp'].dt.dayofweek, categories=DAYS)
     return df
-def train_forecast_model(df):
-    df_grouped =  df.groupby(df['timestamp'].dt.hour)["usage_kwh"].sum().reset_index()
+def _is_parquet(path):
+    name = getattr(path, 'name', path)
+    if isinstance(name, str) and name.lower().endswith(('.parquet', '.pq')):
+        return True
+    if hasattr(path, 'read'):  # Uploaded bytes: check the Parquet magic number
+        position = path.tell()
+        magic = path.read(4)
+        path.seek(position)
+        return magic == b'PAR1'
+    return False
+def _iter_parquet(path, chunksize):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    columns = [name for name in ('timestamp', 'device', 'usage_kwh') if name in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield _prepare(batch.to_pandas())
+def load_data(path="data/sample_energy.csv", chunksize=None):
+    # CSV or Parquet. With chunksize, returns an iterator of typed chunks (like read_csv's
+    # chunksize) for energy_features.accumulate_features, so the full file is never in memory.
+    if _is_parquet(path):
+        if chunksize:
+            return _iter_parquet(path, chunksize)
+        return _prepare(pd.read_parquet(path))
+    if chunksize:
+        reader = pd.read_csv(path, parse_dates=["timestamp"], dtype=USAGE_DTYPES, chunksize=chunksize)
+        return (_prepare(chunk) for chunk in reader)
+    return _prepare(pd.read_csv(path, parse_dates=["timestamp"], dtype=USAGE_DTYPES))
+def train_forecast_model(df, hourly=None):
+    # hourly: precomputed hour/usage_kwh totals (EnergyFeatures.hourly_totals) to skip the groupby
+    if hourly is not None:
+        df_grouped = hourly.rename(columns={'hour': 'timestamp'})
+    else:
+        df_grouped = df.groupby(df['hour'])["usage_kwh"].sum().rename_axis('timestamp').reset_index()
     X = df_grouped[['timestamp']]
     y = df_grouped['usage_kwh']
-    X_train, X_test, y_train, y_test = train_test_split(X, y)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, random_state=0)
     model = LinearRegression()
     model.fit(X_train, y_train)
     return model
 def predict_usage(model, hours):
-    return model.predict(np.array(hours).reshape(-1, 1))
\ No newline at end of file
+    return model.predict(np.array(hours).reshape(-1, 1))
+def _hourly(series):
+    # Hourly totals on a gap-free index (hours without readings count as 0)
+    return series.resample('h').sum().astype(np.float64)
+class UsageForecaster:
+    # Hourly usage model: ridge regression on lag, rolling-mean and calendar (hour, weekday)
+    # features. Training keeps only the normal equations (X'X, X'y) and the last few hours of
+    # history, so update() folds in new readings without revisiting old ones, and forecast()
+    # rolls the model forward one hour at a time for any horizon.
+    def __init__(self, lags=(1, 2, 3, 24), windows=(3, 24), alpha=1.0):
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.alpha = alpha
+        self.history_size = max(self.lags + self.windows)
+        n_features = len(self.lags) + len(self.windows) + 24 + 7
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros(n_features)
+        self.coef = np.zeros(n_features)
+        self.n_samples = 0
+        self.tail = np.zeros(0)  # Last history_size hourly values
+        self.last_timestamp = None
+    def _design(self, values, timestamps, start):
+        # Feature rows for values[start:], one vectorized pass (rolling means via cumulative sums)
+        rows = np.arange(start, len(values))
+        cumulative = np.concatenate([[0.0], np.cumsum(values)])
+        columns = [values[rows - lag] for lag in self.lags]
+        columns += [(cumulative[rows] - cumulative[rows - window]) / window for window in self.windows]
+        calendar = np.zeros((len(rows), 24 + 7))
+        calendar[np.arange(len(rows)), timestamps.hour] = 1
+        calendar[np.arange(len(rows)), 24 + timestamps.dayofweek] = 1
+        return np.column_stack(columns + [calendar])
+    def fit(self, series):
+        self.__init__(self.lags, self.windows, self.alpha)
+        return self.update(series)
+    def update(self, series):
+        # Warm-start refit: only readings newer than the last seen hour are added
+        series = _hourly(series)
+        if self.last_timestamp is not None:
+            series = series[series.index > self.last_timestamp]
+            if series.empty:
+                return self
+            series = series.reindex(pd.date_range(self.last_timestamp + pd.Timedelta(hours=1), series.index[-1], freq='h'), fill_value=0.0)
+        if series.empty:
+            return self
+        values = np.concatenate([self.tail, series.to_numpy()])
+        start = max(len(self.tail), self.history_size)
+        if start < len(values):
+            X = self._design(values, series.index[start - len(self.tail):], start)
+            y = values[start:]
+            self.xtx += X.T @ X
+            self.xty += X.T @ y
+            self.n_samples += len(y)
+            self.coef = np.linalg.solve(self.xtx + self.alpha * np.eye(len(self.xty)), self.xty)
+        self.tail = values[-self.history_size:]
+        self.last_timestamp = series.index[-1]
+        return self
+    def forecast(self, horizon=24):
+        if self.n_samples == 0:
+            raise ValueError(f"Need more than {self.history_size} hours of readings to forecast")
+        timestamps = pd.date_range(self.last_timestamp + pd.Timedelta(hours=1), periods=horizon, freq='h')
+        buffer = np.concatenate([self.tail, np.zeros(horizon)])
+        for step in range(horizon):
+            position = self.history_size + step
+            window = buffer[position - self.history_size:position + 1]
+            row = self._design(window, timestamps[step:step + 1], self.history_size)[0]
+            buffer[position] = max(row @ self.coef, 0.0)  # Usage is never negative
+        return pd.Series(buffer[self.history_size:], index=timestamps, name='usage_kwh')
+def benchmark(path="sample_energy (1).csv", holdout=24):
+    # Holds out the last `holdout` hours and compares both models on them. The old model
+    # predicts hour-of-day totals over the training period, so it is divided by the number
+    # of training days to get a per-hour forecast.
+    import time
+    series = _hourly(load_data(path).groupby('timestamp')['usage_kwh'].sum())
+    train, test = series.iloc[:-holdout], series.iloc[-holdout:]
+    training_frame = pd.DataFrame({'timestamp': train.index, 'hour': train.index.hour, 'usage_kwh': train.to_numpy()})
+    n_days = max(train.index.normalize().nunique(), 1)
+    start = time.perf_counter()
+    baseline = train_forecast_model(training_frame)
+    baseline_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    baseline_pred = predict_usage(baseline, test.index.hour) / n_days
+    baseline_predict = time.perf_counter() - start
+    start = time.perf_counter()
+    forecaster = UsageForecaster().fit(train)
+    engine_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    engine_pred = forecaster.forecast(holdout).to_numpy()
+    engine_predict = time.perf_counter() - start
+    start = time.perf_counter()
+    forecaster.update(test)
+    engine_update = time.perf_counter() - start
+    actual = test.to_numpy()
+    for name, pred, fit_time, predict_time in (("LinearRegression on hour", baseline_pred, baseline_fit, baseline_predict), ("UsageForecaster", engine_pred, engine_fit, engine_predict)):
+        mae = np.abs(pred - actual).mean()
+        rmse = np.sqrt(((pred - actual) ** 2).mean())
+        print(f"{name:26s} fit {fit_time * 1000:7.1f} ms  predict {predict_time * 1000:7.1f} ms  MAE {mae:.3f}  RMSE {rmse:.3f} kWh")
+    print(f"UsageForecaster warm-start update with {holdout} new hours: {engine_update * 1000:.1f} ms")
+if __name__ == "__main__":
+    benchmark()
\ No newline at end of file
@@ -0,0 +1,121 @@
+# Import necessary modules
+import threading  # Guards the cache across request threads
+from collections import OrderedDict  # Ordered dict gives us LRU ordering for free
+
+# ----------------------------------------
+# === Cached Forecast Entry ===
+# ----------------------------------------
+
+class CachedForecast:
+    """
+    The forecast for a single product. Fitted models stay in the compute pool workers,
+    so only the forecast frame is cached.
+    The fingerprint records which version of the sales data it was fitted on.
+    """
+
+    def __init__(self, product_id, fingerprint, forecast):
+        self.product_id = product_id
+        self.fingerprint = fingerprint  # (row_count, max_date) of the data used for fitting
+        self.forecast = forecast        # DataFrame with ds / yhat / yhat_lower / yhat_upper
+        self.nbytes = estimate_nbytes(forecast)
+
+
+def estimate_nbytes(forecast):
+    """
+    Memory footprint of a cache entry in bytes (the forecast frame).
+    """
+    return int(forecast.memory_usage(deep=True).sum())
+
+# ----------------------------------------
+# === LRU Forecast Cache ===
+# ----------------------------------------
+
+class ForecastCache:
+    """
+    Per-product LRU cache of fitted forecasts with an entry limit and a memory cap.
+    An entry is only returned when its fingerprint matches the current data,
+    so new sales rows automatically invalidate the old fit.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries  # Maximum number of products kept in memory
+        self.max_bytes = max_bytes      # Memory cap across all cached entries
+        self._entries = OrderedDict()   # product_id -> CachedForecast (oldest first)
+        self._total_bytes = 0
+        self._lock = threading.Lock()   # Guards _entries and _total_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, product_id, fingerprint):
+        """
+        Returns the cached entry for product_id if it was fitted on the same data, else None.
+        Stale entries (fingerprint mismatch) are dropped on the spot.
+        """
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.fingerprint != fingerprint:
+                # New sales rows arrived since this fit -> invalidate
+                self._remove(product_id)
+                self.misses += 1
+                return None
+
+            # Mark as most recently used
+            self._entries.move_to_end(product_id)
+            self.hits += 1
+            return entry
+
+    def put(self, product_id, fingerprint, forecast):
+        """
+        Stores a freshly fitted forecast, evicting least recently used
+        entries until both the entry limit and the memory cap are respected.
+        """
+        entry = CachedForecast(product_id, fingerprint, forecast)
+        with self._lock:
+            if product_id in self._entries:
+                self._remove(product_id)
+
+            self._entries[product_id] = entry
+            self._total_bytes += entry.nbytes
+
+            # Evict oldest entries, but never the one we just added
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+        return entry
+
+    def invalidate(self, product_id=None):
+        """
+        Drops the cached fit for one product, or the whole cache when product_id is None.
+        """
+        with self._lock:
+            if product_id is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            elif product_id in self._entries:
+                self._remove(product_id)
+
+    def stats(self):
+        """
+        Returns cache size and hit/miss counters for monitoring.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remove(self, product_id):
+        # Caller must hold self._lock
+        entry = self._entries.pop(product_id)
+        self._total_bytes -= entry.nbytes
@@ -0,0 +1,281 @@
+# Import necessary modules
+import argparse  # Command-line options for the grouped forecast run
+import time  # Timing
+from concurrent.futures import ProcessPoolExecutor  # Prophet fits in parallel (opt-in model)
+import numpy as np  # Batched exponential smoothing over a series x days array
+import pandas as pd  # Series matrix and long-format output
+
+# ----------------------------------------
+# === Configuration ===
+# ----------------------------------------
+
+TOTAL_REGION = "ALL"  # Region label of the product-level (total) series
+SEASON_LENGTH = 7     # Weekly seasonality on daily sales
+Z_80 = 1.2816         # 80% interval, the same width Prophet reports by default
+
+# Smoothing constants tried for every series; each series keeps the combination with the
+# lowest one-step-ahead error. (alpha: level, beta: trend, gamma: seasonality)
+ETS_GRID = [
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5)
+    for beta in (0.0, 0.05)
+    for gamma in (0.1, 0.3)
+]
+
+MODELS = {"ets", "prophet"}
+RECONCILIATIONS = {"ols", "bottom_up"}
+
+# ----------------------------------------
+# === Loading (product, region) Daily Series ===
+# ----------------------------------------
+
+def grouped_history_pipeline(product_id=None):
+    """
+    Aggregation that sums sales per (product, region, day) inside MongoDB,
+    so one document per series and day comes back instead of every sale.
+    """
+    stages = [{"$match": {"product_id": product_id}}] if product_id else []
+    return stages + [
+        {"$group": {
+            "_id": {"product_id": "$product_id", "region": "$region", "date": "$date"},
+            "sales_quantity": {"$sum": "$sales_quantity"},
+        }},
+    ]
+
+def build_series_matrix(groups):
+    """
+    Aggregation output -> (product_id, region) x day matrix, days without sales filled with 0.
+    Product totals are added as (product_id, TOTAL_REGION) rows, so each product contributes
+    its region series (bottom level) and one total series (top level).
+    """
+    df = pd.DataFrame([{**g["_id"], "sales_quantity": g["sales_quantity"]} for g in groups])
+    if df.empty:
+        return pd.DataFrame(dtype=np.float64)
+    df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+    regions = df.pivot_table(index=["product_id", "region"], columns="date", values="sales_quantity",
+                             aggfunc="sum", fill_value=0)
+    regions = regions.reindex(columns=pd.date_range(regions.columns.min(), regions.columns.max(), freq="D"),
+                              fill_value=0)
+    totals = regions.groupby(level="product_id").sum()
+    totals.index = pd.MultiIndex.from_arrays([totals.index, [TOTAL_REGION] * len(totals)],
+                                             names=["product_id", "region"])
+    return pd.concat([regions, totals]).sort_index().astype(np.float64)
+
+# ----------------------------------------
+# === Batched Exponential Smoothing (default model) ===
+# ----------------------------------------
+
+def _holt_winters(Y, periods, alpha, beta, gamma, season_length):
+    """
+    Additive Holt-Winters for every row of Y at once. The loop runs over time only;
+    each step updates all series with array operations.
+    Returns (forecast, sum of squared one-step errors, residual std).
+    """
+    n_series, n_days = Y.shape
+    m = season_length
+    level = Y[:, :m].mean(axis=1)
+    if n_days >= 2 * m and m > 1:
+        trend = (Y[:, m:2 * m].mean(axis=1) - level) / m
+    else:
+        trend = np.zeros(n_series)
+    season = Y[:, :m] - level[:, None] if m > 1 else np.zeros((n_series, 1))
+
+    sse = np.zeros(n_series)
+    for t in range(m, n_days):
+        s = season[:, t % m]
+        error = Y[:, t] - (level + trend + s)
+        sse += error * error
+        new_level = alpha * (Y[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, t % m] = gamma * (Y[:, t] - new_level) + (1 - gamma) * s
+        level = new_level
+
+    steps = np.arange(1, periods + 1)
+    forecast = level[:, None] + steps * trend[:, None] + season[:, (n_days - 1 + steps) % m]
+    sigma = np.sqrt(sse / max(n_days - m, 1))
+    return forecast, sse, sigma
+
+def ets_forecast(Y, periods, season_length=SEASON_LENGTH, grid=ETS_GRID):
+    """
+    Batched exponential smoothing with per-series parameter choice from `grid`.
+    Weekly seasonality is used when there are at least two full seasons of history.
+    Returns (yhat, half_width) arrays of shape series x periods (80% interval half-width).
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    m = season_length if Y.shape[1] >= 2 * season_length else 1
+    best_sse = np.full(Y.shape[0], np.inf)
+    best_forecast = np.zeros((Y.shape[0], periods))
+    best_sigma = np.zeros(Y.shape[0])
+    for alpha, beta, gamma in grid:
+        forecast, sse, sigma = _holt_winters(Y, periods, alpha, beta, gamma, m)
+        better = sse < best_sse
+        best_sse = np.where(better, sse, best_sse)
+        best_forecast[better] = forecast[better]
+        best_sigma = np.where(better, sigma, best_sigma)
+    half_width = Z_80 * best_sigma[:, None] * np.sqrt(np.arange(1, periods + 1))
+    return best_forecast, half_width
+
+# ----------------------------------------
+# === Prophet (opt-in model, one fit per series) ===
+# ----------------------------------------
+
+def prophet_series_forecast(dates, values, periods):
+    """
+    Fits Prophet on one daily series and returns (yhat, half_width) arrays of length `periods`.
+    Runs in a worker process (see forecast_grouped and main.py).
+    """
+    from batch_forecast import fit_product_forecast
+    history = [{"date": date, "sales_quantity": value} for date, value in zip(dates, values)]
+    _, forecast = fit_product_forecast(history, periods)
+    half_width = (forecast["yhat_upper"] - forecast["yhat_lower"]).to_numpy() / 2
+    return forecast["yhat"].to_numpy(), half_width
+
+def prophet_forecast_many(dates, rows, periods):
+    """
+    Fits Prophet on several series one after another in the same worker and returns
+    (yhat, half_width) arrays of shape len(rows) x periods. Lets main.py send a product's
+    series as a few pool tasks instead of one task per series.
+    """
+    results = [prophet_series_forecast(dates, values, periods) for values in rows]
+    return np.array([result[0] for result in results]), np.array([result[1] for result in results])
+
+# ----------------------------------------
+# === Reconciliation ===
+# ----------------------------------------
+
+def reconcile(index, yhat, half_width, method="ols"):
+    """
+    Makes the forecasts coherent: each product's total equals the sum of its regions.
+
+    - bottom_up: region forecasts are kept and totals are their sums.
+    - ols:       the gap between a product's own total forecast and the sum of its regions
+                 is shared equally by the k regions and the total (OLS reconciliation for a
+                 two-level hierarchy): region += gap / (k + 1); totals are then re-summed.
+    Negative region forecasts are clipped to 0 before summing, so coherence is kept.
+    Intervals keep each series' own half-width around the reconciled value.
+    """
+    is_total = index.get_level_values("region") == TOTAL_REGION
+    products = index.get_level_values("product_id")
+    product_codes, product_names = pd.factorize(products)
+
+    bottom = np.flatnonzero(~is_total)
+    top = np.flatnonzero(is_total)
+    top_row_of_product = np.full(len(product_names), -1)
+    top_row_of_product[product_codes[top]] = top
+
+    bottom_yhat = yhat[bottom].copy()
+    bottom_codes = product_codes[bottom]
+    region_sums = np.zeros((len(product_names), yhat.shape[1]))
+    np.add.at(region_sums, bottom_codes, bottom_yhat)
+
+    if method == "ols":
+        region_counts = np.bincount(bottom_codes, minlength=len(product_names))
+        has_top = top_row_of_product[bottom_codes] >= 0
+        gap = yhat[top_row_of_product[bottom_codes]] - region_sums[bottom_codes]
+        bottom_yhat += np.where(has_top[:, None], gap / (region_counts[bottom_codes] + 1)[:, None], 0.0)
+    elif method != "bottom_up":
+        raise ValueError(f"reconciliation must be one of {sorted(RECONCILIATIONS)}")
+
+    bottom_yhat = np.clip(bottom_yhat, 0, None)
+    reconciled = np.zeros_like(yhat)
+    reconciled[bottom] = bottom_yhat
+    totals = np.zeros((len(product_names), yhat.shape[1]))
+    np.add.at(totals, bottom_codes, bottom_yhat)
+    reconciled[top] = totals[product_codes[top]]
+    return reconciled, half_width
+
+def to_long_frame(index, dates, yhat, half_width):
+    """
+    series x periods arrays -> one row per (product_id, region, ds), like the Prophet output.
+    """
+    n_series, periods = yhat.shape
+    return pd.DataFrame({
+        "product_id": np.repeat(index.get_level_values("product_id"), periods),
+        "region": np.repeat(index.get_level_values("region"), periods),
+        "ds": np.tile(dates, n_series),
+        "yhat": yhat.ravel(),
+        "yhat_lower": np.clip(yhat - half_width, 0, None).ravel(),
+        "yhat_upper": (yhat + half_width).ravel(),
+    })
+
+# ----------------------------------------
+# === Grouped Forecast ===
+# ----------------------------------------
+
+def future_dates(matrix, periods):
+    return pd.date_range(matrix.columns.max() + pd.Timedelta(days=1), periods=periods, freq="D")
+
+def forecast_grouped(matrix, periods=30, model="ets", reconciliation="ols", workers=None):
+    """
+    Forecasts every (product, region) series and every product total in `matrix`
+    (from build_series_matrix) and reconciles them. Returns a long DataFrame with
+    product_id / region / ds / yhat / yhat_lower / yhat_upper (region TOTAL_REGION = product total).
+    """
+    if model not in MODELS:
+        raise ValueError(f"model must be one of {sorted(MODELS)}")
+    if matrix.empty:
+        return to_long_frame(matrix.index, [], np.zeros((0, periods)), np.zeros((0, periods)))
+
+    if model == "ets":
+        yhat, half_width = ets_forecast(matrix.to_numpy(), periods)
+    else:
+        dates = list(matrix.columns)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(prophet_series_forecast, [dates] * len(matrix),
+                                    list(matrix.to_numpy()), [periods] * len(matrix)))
+        yhat = np.array([result[0] for result in results])
+        half_width = np.array([result[1] for result in results])
+
+    yhat, half_width = reconcile(matrix.index, yhat, half_width, reconciliation)
+    return to_long_frame(matrix.index, future_dates(matrix, periods), yhat, half_width)
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+def synthetic_matrix(n_products, n_regions=4, n_days=730, seed=0):
+    """
+    Random weekly-seasonal sales for benchmarking (n_products x n_regions series plus totals).
+    """
+    rng = np.random.default_rng(seed)
+    n_series = n_products * n_regions
+    days = np.arange(n_days)
+    base = rng.uniform(20, 200, size=(n_series, 1))
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * days / 7 + rng.uniform(0, 2 * np.pi, size=(n_series, 1)))
+    sales = rng.poisson(base * weekly).astype(np.float64)
+    index = pd.MultiIndex.from_product([[f"P{i:05d}" for i in range(n_products)],
+                                        [f"R{j}" for j in range(n_regions)]], names=["product_id", "region"])
+    regions = pd.DataFrame(sales, index=index, columns=pd.date_range("2023-01-01", periods=n_days, freq="D"))
+    totals = regions.groupby(level="product_id").sum()
+    totals.index = pd.MultiIndex.from_arrays([totals.index, [TOTAL_REGION] * len(totals)],
+                                             names=["product_id", "region"])
+    return pd.concat([regions, totals]).sort_index()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast sales per (product, region) with reconciled totals.")
+    parser.add_argument("--product-id", default=None, help="Only this product (default: all)")
+    parser.add_argument("--model", choices=sorted(MODELS), default="ets")
+    parser.add_argument("--reconciliation", choices=sorted(RECONCILIATIONS), default="ols")
+    parser.add_argument("--periods", type=int, default=30, help="Days to forecast ahead")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for --model prophet")
+    parser.add_argument("--output", default="grouped_forecast.csv", help="Output CSV")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Benchmark on this many synthetic products (4 regions each) instead of MongoDB")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.synthetic:
+        matrix = synthetic_matrix(args.synthetic)
+    else:
+        from pymongo import MongoClient
+        from batch_forecast import MONGO_URI, DB_NAME, SALES_COLLECTION
+        sales = MongoClient(MONGO_URI)[DB_NAME][SALES_COLLECTION]
+        matrix = build_series_matrix(sales.aggregate(grouped_history_pipeline(args.product_id), allowDiskUse=True))
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = forecast_grouped(matrix, args.periods, args.model, args.reconciliation, args.workers)
+    fitted = time.perf_counter() - start
+    result.to_csv(args.output, index=False)
+    print(f"📈 {len(matrix)} series x {matrix.shape[1]} days -> {args.output}: "
+          f"loaded in {loaded:.2f}s, forecast ({args.model}, {args.reconciliation}) in {fitted:.2f}s")
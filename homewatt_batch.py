@@ -0,0 +1,196 @@
+# Nightly HomeWatt analytics for many households: one meter file per household
+import argparse  # Command-line options for the batch job
+import glob  # Expand file patterns
+import json  # Progress manifest lines
+import os  # File metadata and paths
+import time  # Per-household and total timings
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Households in parallel
+import pandas as pd  # Consolidated report
+
+from analyzer import StreamingAnomalyDetector
+from energy_features import accumulate_features
+from forecast import load_data, UsageForecaster
+from recommender import generate_recommendations
+
+METER_EXTENSIONS = (".csv", ".parquet", ".pq")
+CHUNKSIZE = 200_000     # Rows per chunk while reading a meter file
+FORECAST_HOURS = 24
+
+# ----------------------------------------
+# === Per-Household Pipeline (runs in a worker process) ===
+# ----------------------------------------
+
+def detector_state_path(state_dir, household):
+    return os.path.join(state_dir, f"{household}.json")
+
+
+def analyze_household(path, chunksize=CHUNKSIZE, horizon=FORECAST_HOURS, state_dir=None, resume=True):
+    """
+    Runs load -> features -> forecast -> anomalies -> recommendations for one meter file
+    and returns a flat summary row with per-stage timings. Only this small dict travels
+    back to the parent, so workers do not contend on inter-process traffic.
+    With state_dir and resume, the household's anomaly detector is resumed from there, so
+    each nightly run only scores (and counts anomalies in) readings newer than the previous
+    one. The updated state comes back under "detector_state"; the caller saves it once the
+    row is recorded, so a household that crashes in between is scored again next time.
+    """
+    household = os.path.splitext(os.path.basename(path))[0]
+    stat = os.stat(path)
+    row = {"household": household, "path": path, "mtime": stat.st_mtime, "size": stat.st_size}
+    start = time.perf_counter()
+    try:
+        features = accumulate_features(load_data(path, chunksize=chunksize))
+        row["features_s"] = time.perf_counter() - start
+
+        step = time.perf_counter()
+        forecaster = UsageForecaster().fit(features.series)
+        forecast = forecaster.forecast(horizon) if forecaster.n_samples else None
+        row["forecast_s"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        state_path = detector_state_path(state_dir, household) if state_dir else None
+        if resume and state_path and os.path.exists(state_path):
+            detector = StreamingAnomalyDetector.load(state_path)
+        else:
+            detector = StreamingAnomalyDetector()
+        scored = detector.score(features.series)
+        if state_path:
+            row["detector_state"] = detector.to_dict()
+        anomalies = scored[scored["anomaly"] == -1]
+        row["anomaly_s"] = time.perf_counter() - step
+
+        row.update({
+            "status": "ok",
+            "error": None,
+            "first_reading": str(features.series.index.min()) if len(features.series) else None,
+            "last_reading": str(features.series.index.max()) if len(features.series) else None,
+            "total_kwh": float(features.series.sum()),
+            "mean_usage_kwh": features.mean_usage,
+            "max_usage_kwh": features.max_usage,
+            "forecast_kwh": float(forecast.sum()) if forecast is not None else None,
+            "anomalies": len(anomalies),
+            "last_anomaly": str(anomalies["timestamp"].max()) if len(anomalies) else None,
+            "recommendations": " | ".join(
+                generate_recommendations(None, features.mean_usage, features.max_usage)
+            ),
+        })
+    except Exception as exc:  # One bad file should not stop the batch
+        row.update({"status": "error", "error": f"{type(exc).__name__}: {exc}"})
+    row["total_s"] = time.perf_counter() - start
+    return row
+
+# ----------------------------------------
+# === Progress Manifest (makes the batch restartable) ===
+# ----------------------------------------
+
+def find_meter_files(source):
+    """A directory (its meter files) or a glob pattern such as 'meters/**/*.csv'."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if path.lower().endswith(METER_EXTENSIONS) and os.path.isfile(path))
+
+
+def load_manifest(manifest_path):
+    """Latest row per path from the append-only manifest (a torn last line is ignored)."""
+    rows = {}
+    if not os.path.exists(manifest_path):
+        return rows
+    with open(manifest_path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows[row["path"]] = row
+    return rows
+
+
+def is_done(row, path):
+    # Done = processed successfully and the file has not changed since
+    stat = os.stat(path)
+    return row is not None and row["status"] == "ok" and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size
+
+
+def write_report(rows, report_path):
+    report = pd.DataFrame(rows).sort_values("household")
+    if report_path.lower().endswith(".csv"):
+        report.to_csv(report_path, index=False)
+    else:
+        report.to_parquet(report_path, index=False)
+    return report
+
+# ----------------------------------------
+# === Batch Driver ===
+# ----------------------------------------
+
+def run_batch(source, report_path, workers=None, chunksize=CHUNKSIZE, horizon=FORECAST_HOURS,
+              state_dir=None, force=False):
+    """
+    Analyzes every meter file under `source` across a process pool.
+    Each finished household is appended to <report>.progress.jsonl right away, so an
+    interrupted run picks up where it stopped; files already processed (same mtime and
+    size) are skipped unless force=True, which also starts each anomaly detector afresh.
+    Detector state is saved only after the household's manifest row is written.
+    The consolidated report covers all households.
+    """
+    manifest_path = report_path + ".progress.jsonl"
+    manifest = {} if force else load_manifest(manifest_path)
+    paths = find_meter_files(source)
+    pending = [path for path in paths if not is_done(manifest.get(path), path)]
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    failed = {}
+    with open(manifest_path, "a") as progress, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_household, path, chunksize, horizon, state_dir, not force) for path in pending]
+        for future in as_completed(futures):
+            row = future.result()
+            state = row.pop("detector_state", None)
+            manifest[row["path"]] = row
+            progress.write(json.dumps(row) + "\n")
+            progress.flush()
+            if state is not None and row["status"] == "ok":
+                StreamingAnomalyDetector.from_dict(state).save(detector_state_path(state_dir, row["household"]))
+            if row["status"] == "ok":
+                print(f"✅ {row['household']}: {row['anomalies']} anomalies in {row['total_s']:.2f}s")
+            else:
+                failed[row["household"]] = row["error"]
+                print(f"❌ {row['household']}: {row['error']}")
+    seconds = time.perf_counter() - start
+
+    rows = [manifest[path] for path in paths if path in manifest]
+    if rows:
+        write_report(rows, report_path)
+    return {
+        "households": len(paths),
+        "skipped": len(paths) - len(pending),
+        "processed": len(pending),
+        "failed": failed,
+        "seconds": round(seconds, 2),
+        "households_per_second": round(len(pending) / seconds, 2) if pending and seconds else None,
+        "report": report_path,
+    }
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run HomeWatt analytics for many households.")
+    parser.add_argument("source", help="Directory of meter files, or a glob such as 'meters/**/*.csv'")
+    parser.add_argument("--report", default="homewatt_report.parquet",
+                        help="Consolidated report (.parquet, or .csv for CSV)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="Rows per chunk when reading a file")
+    parser.add_argument("--horizon", type=int, default=FORECAST_HOURS, help="Hours to forecast ahead")
+    parser.add_argument("--state-dir", default=None,
+                        help="Keep per-household anomaly detector state here between runs")
+    parser.add_argument("--force", action="store_true", help="Reprocess files that were already done")
+    args = parser.parse_args()
+
+    summary = run_batch(args.source, args.report, workers=args.workers, chunksize=args.chunksize,
+                        horizon=args.horizon, state_dir=args.state_dir, force=args.force)
+    print(f"📦 Batch finished: {summary}")
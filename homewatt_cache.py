@@ -0,0 +1,96 @@
+import hashlib
+import io
+import os
+import streamlit as st
+
+from energy_features import accumulate_features
+from energy_passages import build_passages, GENERAL_PASSAGES
+from forecast import load_data, train_forecast_model, predict_usage, UsageForecaster
+from analyzer import detect_anomalies, StreamingAnomalyDetector
+from recommender import generate_recommendations
+
+# Streamlit re-runs the whole script on every widget interaction. Everything expensive
+# lives here behind st.cache_resource / st.cache_data so it survives those reruns.
+
+QA_MODEL = "distilbert-base-cased-distilled-squad"
+SIMILARITY_MODEL = "all-MiniLM-L6-v2"
+
+
+def content_hash(data):
+    # Stable key for uploaded bytes or a list of strings
+    if isinstance(data, (list, tuple)):
+        data = "\n".join(data).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+# Models: one instance per process and model name
+@st.cache_resource(show_spinner="Loading QA model...")
+def get_qa_pipeline(model_name=QA_MODEL):
+    from transformers import pipeline
+    return pipeline("question-answering", model=model_name)
+
+
+@st.cache_resource(show_spinner="Loading similarity model...")
+def get_similarity_model(model_name=SIMILARITY_MODEL):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+# Corpus embeddings: keyed on model name + corpus hash (the leading underscore tells
+# Streamlit not to hash the corpus itself, the hash argument already identifies it)
+@st.cache_resource(show_spinner=False)
+def get_corpus_embeddings(model_name, corpus_hash, _corpus):
+    return get_similarity_model(model_name).encode(list(_corpus), convert_to_tensor=True)
+
+
+# Assistant context: the question is matched against the upload's passages (embedded once
+# per upload via get_corpus_embeddings) and only the top-k go to the QA model
+CONTEXT_PASSAGES = 3
+
+
+def retrieve_passages(question, passages=None, k=CONTEXT_PASSAGES, model_name=SIMILARITY_MODEL):
+    from sentence_transformers import util
+    passages = passages or GENERAL_PASSAGES
+    passage_embeddings = get_corpus_embeddings(model_name, content_hash(passages), tuple(passages))
+    query_embedding = get_similarity_model(model_name).encode(question, convert_to_tensor=True)
+    scores = util.cos_sim(query_embedding, passage_embeddings)[0]
+    top = scores.topk(min(k, len(passages))).indices.tolist()
+    return [passages[i] for i in top]
+
+
+# Per-upload processing: keyed on the file's hash, so re-uploading or interacting with
+# other widgets reuses the aggregates, forecast, anomalies and suggestions
+UPLOAD_CHUNKSIZE = 200_000  # Rows per chunk; only running aggregates are kept between chunks
+FORECAST_HOURS = 24
+# "streaming": per-hour-of-day robust z-scores on the hourly series (deterministic, O(1) per reading)
+# "isolation_forest": the batch IsolationForest over daily totals (seeded)
+ANOMALY_METHOD = os.environ.get("HOMEWATT_ANOMALY_METHOD", "streaming")
+
+
+@st.cache_data(show_spinner="Analyzing your data...", max_entries=8)
+def analyze_upload(file_hash, _file_bytes):
+    try:
+        features = accumulate_features(load_data(io.BytesIO(_file_bytes), chunksize=UPLOAD_CHUNKSIZE))
+    except ValueError:  # Missing 'timestamp' / 'usage_kwh' columns or unparsable file
+        return None
+
+    # The full frame is never materialized; every consumer works from the aggregates
+    forecaster = UsageForecaster().fit(features.series)
+    if forecaster.n_samples:
+        forecast = forecaster.forecast(FORECAST_HOURS)
+    else:  # Too little history for lag features: fall back to the hour-of-day profile
+        forecast = predict_usage(train_forecast_model(None, hourly=features.hourly_totals), list(range(24)))
+    if ANOMALY_METHOD == "isolation_forest":
+        anomalies = detect_anomalies(None, daily=features.daily_totals)
+    else:
+        anomalies = StreamingAnomalyDetector().score(features.series)
+    return {
+        "series": features.series,
+        "hourly_usage": features.hourly_totals,
+        "heatmap_data": features.day_hour,
+        "rolling": features.rolling,
+        "forecast": forecast,
+        "anomalies": anomalies,
+        "recommendations": generate_recommendations(None, features.mean_usage, features.max_usage),
+        "passages": build_passages(features, anomalies, forecast),
+    }
@@ -0,0 +1,191 @@
+# Import necessary modules
+import argparse  # Command-line options for the catalog run
+import time  # Timing of the catalog run
+import numpy as np  # Vectorized inventory formulas
+import pandas as pd  # Forecast matrix and per-product parameters
+from scipy.special import ndtri  # Inverse normal CDF: service level -> z-score, vectorized
+
+# ----------------------------------------
+# === Default Inventory Parameters ===
+# ----------------------------------------
+
+# Used for every product unless a per-product value is given
+DEFAULT_LEAD_TIME_DAYS = 5         # Days it takes to receive new stock
+DEFAULT_HOLDING_COST = 2.5         # Cost of keeping one unit in stock for a year
+DEFAULT_ORDERING_COST = 50.0       # Fixed cost of placing one order
+DEFAULT_SERVICE_LEVEL = 0.95       # Probability of not running out during the lead time (z = 1.645)
+DAYS_PER_YEAR = 365
+
+PARAM_COLUMNS = ["lead_time_days", "holding_cost_per_unit", "ordering_cost", "service_level"]
+
+# ----------------------------------------
+# === Inputs ===
+# ----------------------------------------
+
+def build_forecast_matrix(rows):
+    """
+    Turns forecast rows (product_id, ds, yhat[, created_at]) into a products x horizon-steps matrix.
+    If a product has several stored runs, only its latest run is kept.
+    Columns are steps 1..H counted from each product's own first ds, not calendar dates, so a
+    forecast that starts later than the others is not padded with leading empty days.
+    """
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return pd.DataFrame(dtype=np.float64)
+    if "created_at" in df.columns:
+        latest = df.groupby("product_id")["created_at"].transform("max")
+        df = df[df["created_at"] == latest]
+    daily = df.groupby(["product_id", "ds"], as_index=False)["yhat"].mean()  # Sorted by product, then ds
+    daily["step"] = daily.groupby("product_id").cumcount() + 1
+    matrix = daily.pivot(index="product_id", columns="step", values="yhat")
+    return matrix.sort_index(axis=1)
+
+def build_params(product_ids, overrides=None, **defaults):
+    """
+    One row of inventory parameters per product: the defaults (keyword arguments named like
+    PARAM_COLUMNS override the module defaults), then per-product values from `overrides`
+    (a DataFrame or list of dicts with product_id and any of PARAM_COLUMNS).
+    """
+    base = {
+        "lead_time_days": DEFAULT_LEAD_TIME_DAYS,
+        "holding_cost_per_unit": DEFAULT_HOLDING_COST,
+        "ordering_cost": DEFAULT_ORDERING_COST,
+        "service_level": DEFAULT_SERVICE_LEVEL,
+    }
+    base.update({key: value for key, value in defaults.items() if value is not None})
+    params = pd.DataFrame(base, index=pd.Index(product_ids, name="product_id"))
+
+    if overrides is not None and len(overrides):
+        overrides = pd.DataFrame(overrides).set_index("product_id")
+        overrides = overrides[[column for column in PARAM_COLUMNS if column in overrides.columns]]
+        params.update(overrides.reindex(params.index))  # Missing values keep the defaults
+    return params.astype(np.float64)
+
+# ----------------------------------------
+# === Vectorized Catalog Optimization ===
+# ----------------------------------------
+
+def optimize_catalog(forecast_matrix, current_inventory, params):
+    """
+    Computes inventory targets for every product at once (no per-product Python loop).
+
+    forecast_matrix:   products x horizon steps of forecast daily demand (build_forecast_matrix)
+    current_inventory: Series of on-hand units per product
+    params:            build_params() frame (lead time, holding/ordering cost, service level)
+
+    Per product:
+    - safety stock  = z(service level) * daily demand std * sqrt(lead time)
+    - reorder point = forecast demand over the lead time + safety stock
+    - EOQ           = sqrt(2 * annual demand * ordering cost / holding cost)
+    - order now when inventory <= reorder point, ordering max(EOQ, shortfall to the reorder point)
+    """
+    products = forecast_matrix.index
+    demand = np.clip(forecast_matrix.to_numpy(dtype=np.float64), 0, None)  # Negative forecasts mean no demand
+    params = params.reindex(products)
+    inventory = current_inventory.reindex(products).fillna(0).to_numpy(dtype=np.float64)
+
+    lead_time = params["lead_time_days"].to_numpy()
+    holding_cost = params["holding_cost_per_unit"].to_numpy()
+    ordering_cost = params["ordering_cost"].to_numpy()
+    service_level = np.clip(params["service_level"].to_numpy(), 0.5, 0.9999)
+
+    daily_mean = np.nanmean(demand, axis=1)
+    daily_std = np.nanstd(demand, axis=1, ddof=1) if demand.shape[1] > 1 else np.zeros(len(products))
+    z = ndtri(service_level)
+    safety_stock = z * daily_std * np.sqrt(lead_time)
+
+    # Demand over each product's own lead time, read from the forecast's running total.
+    # Lead times longer than a product's forecast horizon extend it at the mean daily demand.
+    horizon = np.sum(~np.isnan(demand), axis=1)  # Steps each product actually has
+    cumulative = np.nancumsum(demand, axis=1)
+    whole_days = np.clip(np.floor(lead_time).astype(np.int64), 0, horizon)
+    covered = np.where(whole_days > 0, cumulative[np.arange(len(products)), np.maximum(whole_days - 1, 0)], 0.0)
+    lead_time_demand = covered + (lead_time - whole_days) * daily_mean
+
+    reorder_point = lead_time_demand + safety_stock
+
+    annual_demand = daily_mean * DAYS_PER_YEAR
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eoq = np.where(holding_cost > 0, np.sqrt(2 * annual_demand * ordering_cost / holding_cost), np.nan)
+        orders_per_year = np.where(eoq > 0, annual_demand / eoq, 0.0)
+
+    reorder_needed = inventory <= reorder_point
+    shortfall = np.maximum(reorder_point - inventory, 0)
+    order_quantity = np.where(reorder_needed, np.fmax(np.nan_to_num(eoq), shortfall), 0.0)
+
+    return pd.DataFrame({
+        "current_inventory": inventory,
+        "predicted_avg_daily_demand": daily_mean,
+        "predicted_demand_std_dev": daily_std,
+        "lead_time_days": lead_time,
+        "service_level": service_level,
+        "safety_stock": safety_stock,
+        "reorder_point": reorder_point,
+        "eoq": eoq,
+        "reorder_needed": reorder_needed,
+        "recommended_reorder_quantity": np.ceil(order_quantity).astype(np.int64),
+        "annual_holding_cost": holding_cost * (np.nan_to_num(eoq) / 2 + safety_stock),
+        "annual_ordering_cost": orders_per_year * ordering_cost,
+    }, index=products)
+
+# ----------------------------------------
+# === Loading From MongoDB (CLI) ===
+# ----------------------------------------
+
+# Latest inventory level per product in one aggregation (served by the product_id_date index)
+LATEST_INVENTORY_PIPELINE = [
+    {"$sort": {"product_id": 1, "date": 1}},
+    {"$group": {"_id": "$product_id", "inventory_level": {"$last": "$inventory_level"}}},
+]
+
+def inventory_series(groups):
+    """Aggregation output of LATEST_INVENTORY_PIPELINE -> Series indexed by product_id."""
+    return pd.Series({g["_id"]: g["inventory_level"] for g in groups}, dtype=np.float64)
+
+def load_catalog_inputs(db):
+    """
+    Reads every product's latest stored forecast (written by batch_forecast.py) and its
+    current inventory level. Returns (forecast_matrix, current_inventory).
+    """
+    from batch_forecast import FORECASTS_COLLECTION, SALES_COLLECTION
+    rows = db[FORECASTS_COLLECTION].find({}, {"_id": 0, "product_id": 1, "ds": 1, "yhat": 1, "created_at": 1})
+    matrix = build_forecast_matrix(list(rows))
+    inventory = inventory_series(db[SALES_COLLECTION].aggregate(LATEST_INVENTORY_PIPELINE, allowDiskUse=True))
+    return matrix, inventory
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+    from batch_forecast import MONGO_URI, DB_NAME
+
+    parser = argparse.ArgumentParser(description="Compute reorder points, safety stock and EOQ for every product.")
+    parser.add_argument("--params", default=None,
+                        help="CSV with product_id and any of: " + ", ".join(PARAM_COLUMNS))
+    parser.add_argument("--service-level", type=float, default=DEFAULT_SERVICE_LEVEL)
+    parser.add_argument("--lead-time-days", type=float, default=DEFAULT_LEAD_TIME_DAYS)
+    parser.add_argument("--holding-cost", type=float, default=DEFAULT_HOLDING_COST, help="Per unit per year")
+    parser.add_argument("--ordering-cost", type=float, default=DEFAULT_ORDERING_COST, help="Per order")
+    parser.add_argument("--output", default="inventory_plan.csv", help="Output CSV")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    start = time.perf_counter()
+    matrix, inventory = load_catalog_inputs(client[DB_NAME])
+    loaded = time.perf_counter() - start
+    params = build_params(
+        matrix.index,
+        pd.read_csv(args.params) if args.params else None,
+        lead_time_days=args.lead_time_days,
+        holding_cost_per_unit=args.holding_cost,
+        ordering_cost=args.ordering_cost,
+        service_level=args.service_level,
+    )
+    start = time.perf_counter()
+    plan = optimize_catalog(matrix, inventory, params)
+    computed = time.perf_counter() - start
+    plan.to_csv(args.output)
+    print(f"📦 {len(plan)} products ({int(plan['reorder_needed'].sum())} to reorder) -> {args.output}: "
+          f"loaded in {loaded:.2f}s, computed in {computed * 1000:.1f} ms")
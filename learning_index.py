@@ -0,0 +1,36 @@
+# === Import Required Libraries ===
+import threading  # Lock so request threads can read while new events are added
+
+# === Per-User Learning Index ===
+# Keeps, for every user, the set of topics seen and a running sum/count of quiz scores.
+# It is updated one event at a time, so lookups cost O(1) per user no matter how many
+# events exist. Topic recommendations come from TopicRecommender, not from this index.
+class UserTopicIndex:
+
+    def __init__(self):
+        self.user_topics = {}   # user_id -> set of topics the user has studied
+        self.score_sum = {}     # user_id -> sum of quiz scores
+        self.score_count = {}   # user_id -> number of quiz scores
+        self.last_id = 0        # Id of the last store event applied to the index
+        self.lock = threading.Lock()
+
+    # Apply new events (dicts with user_id / topic / quiz_score) in order
+    def add_events(self, events, last_id=None):
+        with self.lock:
+            for event in events:
+                user_id = int(event["user_id"])
+                topic = event["topic"]
+                self.user_topics.setdefault(user_id, set()).add(topic)
+                if event.get("quiz_score") is not None:
+                    self.score_sum[user_id] = self.score_sum.get(user_id, 0) + event["quiz_score"]
+                    self.score_count[user_id] = self.score_count.get(user_id, 0) + 1
+            if last_id is not None:
+                self.last_id = last_id
+
+    def has_user(self, user_id):
+        return user_id in self.user_topics
+
+    def average_score(self, user_id):
+        with self.lock:
+            count = self.score_count.get(user_id, 0)
+            return self.score_sum[user_id] / count if count else None
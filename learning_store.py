@@ -0,0 +1,117 @@
+# === Import Required Libraries ===
+import os                               # Atomic file replace for CSV exports
+import queue                            # Hands submissions to the writer thread
+import sqlite3                          # Embedded, durable storage (no server needed)
+import threading                        # Background writer thread
+from contextlib import closing          # Close short-lived read connections
+from concurrent.futures import Future   # Lets each submission wait for its commit
+import pandas as pd                     # Seed import and DataFrame snapshots
+
+# Columns of one learning event (same as edtech_adaptive_learning_dataset.csv)
+COLUMNS = ["user_id", "topic", "time_spent", "quiz_score", "preference", "feedback", "rating"]
+
+# === Append-Only Learning Event Store ===
+# Every submission is one INSERT into an append-only SQLite table (O(1), no file rewrite).
+# Inserts arriving close together are committed in a single transaction (group commit),
+# so the fsync cost is shared. WAL mode lets readers in other workers keep reading
+# the last committed state while a write is in progress.
+class LearningEventStore:
+
+    def __init__(self, db_path="edtech_learning.db", seed_csv=None, max_batch=256, max_wait_ms=5):
+        self.db_path = db_path
+        self.max_batch = max_batch            # Most events committed in one transaction
+        self.max_wait = max_wait_ms / 1000.0  # How long the writer waits for more events
+        self._queue = queue.Queue()           # (event dict, Future) waiting to be written
+
+        # Create the table and import the CSV once if the store is new.
+        # BEGIN IMMEDIATE takes the write lock, so two workers starting together cannot both import.
+        with closing(self._connect()) as conn:
+            conn.isolation_level = None  # Manage the transaction explicitly
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS learning_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, topic TEXT, time_spent INTEGER, "
+                "quiz_score INTEGER, preference TEXT, feedback TEXT, rating INTEGER)"
+            )
+            empty = conn.execute("SELECT COUNT(*) FROM learning_events").fetchone()[0] == 0
+            if empty and seed_csv and os.path.exists(seed_csv):
+                self._import_csv(conn, seed_csv)
+            conn.execute("COMMIT")
+
+        self._writer = threading.Thread(target=self._run_writer, name="learning-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")   # Readers never block on (or see) uncommitted writes
+        conn.execute("PRAGMA synchronous=FULL")   # A committed submission survives a crash
+        return conn
+
+    def _import_csv(self, conn, csv_path, chunksize=50_000):
+        # One-time migration of the existing CSV, in chunks to bound memory
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            conn.executemany(
+                f"INSERT INTO learning_events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                chunk[COLUMNS].astype(object).values.tolist(),  # Plain Python values for sqlite3
+            )
+
+    # === Writing ===
+
+    def append(self, event):
+        """Appends one event and returns its id once it is committed to disk."""
+        future = Future()
+        self._queue.put((event, future))
+        return future.result()
+
+    def _run_writer(self):
+        # Background loop: gather waiting events and commit them in one transaction
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+
+            try:
+                with conn:  # One transaction for the whole batch
+                    ids = [
+                        conn.execute(
+                            f"INSERT INTO learning_events ({', '.join(COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                            [event[column] for column in COLUMNS],
+                        ).lastrowid
+                        for event, _ in batch
+                    ]
+            except Exception as exc:  # Report the failure to every waiting submission
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), event_id in zip(batch, ids):
+                future.set_result(event_id)
+
+    # === Reading ===
+
+    def events_since(self, last_id=0):
+        """Returns (rows, new_last_id) for events with id > last_id, oldest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM learning_events WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+        if not rows:
+            return [], last_id
+        return [dict(zip(COLUMNS, row[1:])) for row in rows], rows[-1][0]
+
+    def load_frame(self):
+        """Returns (DataFrame of all events, last event id)."""
+        rows, last_id = self.events_since(0)
+        return pd.DataFrame(rows, columns=COLUMNS), last_id
+
+    def export_csv(self, csv_path):
+        """Writes a CSV snapshot via a temp file + atomic rename, so readers never see a partial file."""
+        frame, _ = self.load_frame()
+        tmp_path = csv_path + ".tmp"
+        frame.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, csv_path)
@@ -1,50 +1,128 @@
-# Import necessary libraries
-import pandas as pd  # For reading and handling CSV data
-from pymongo import MongoClient  # For connecting and interacting with MongoDB
-
-# ==========================
-# 1. CONNECT TO MONGODB
-# ==========================
-
-# Create a MongoClient instance to connect to the local MongoDB server
-# "localhost" refers to your local machine
-# "27017" is the default port number on which MongoDB runs
-client = MongoClient("mongodb://localhost:27017/")
-
-# Create or access a database named "supply_chain_db"
-# If it doesn't exist, MongoDB will create it automatically
-db = client["supply_chain_db"]
-
-# Create or access a collection (similar to a table in SQL) named "sales_data"
-collection = db["sales_data"]
-
-# ==========================
-# 2. LOAD CSV FILE INTO PANDAS
-# ==========================
-
-# Read the CSV file using pandas
-# Replace 'supply_chain_data.csv' with the correct path to your file if it's not in the same directory
-df = pd.read_csv("supply_chain_data.csv")
-
-# Convert the pandas DataFrame into a list of dictionaries
-# Each dictionary represents one row of data and will be inserted as one document in MongoDB
-data = df.to_dict(orient="records")
-
-# ==========================
-# 3. INSERT DATA INTO MONGODB
-# ==========================
-
-# Optional: Clear old data from the collection before inserting new data
-# This ensures you don't get duplicate data if you run the script multiple times
-collection.delete_many({})  # Deletes all documents from the collection
-
-# Insert the list of dictionaries (records) into MongoDB
-# insert_many allows you to insert all rows at once
-collection.insert_many(data)
-
-# ==========================
-# 4. SUCCESS MESSAGE
-# ==========================
-
-# Print confirmation message to indicate successful upload
-print("✅ Data loaded successfully into MongoDB!")
+# Import necessary libraries
+import argparse  # For command-line options (file, chunk size, staging mode)
+import os  # Read MongoDB URI from the environment
+import pandas as pd  # For reading and handling CSV data
+from pymongo import MongoClient, UpdateOne  # For connecting and interacting with MongoDB
+from mongo_indexes import ensure_sales_indexes  # Index bootstrap shared with the API
+
+# ==========================
+# 1. SETTINGS
+# ==========================
+
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")  # Same setting as the API and batch job
+DB_NAME = "supply_chain_db"  # Database used by the API
+SALES_COLLECTION = "sales_data"  # Collection the API reads from
+STAGING_COLLECTION = "sales_data_staging"  # Temporary collection used for atomic reloads
+META_COLLECTION = "loader_meta"  # Loader bookkeeping, e.g. whether sales_data dates were migrated
+DATES_MARKER = "sales_data_datetime_dates"  # Set once sales_data is known to hold no string dates
+
+# Each row is identified by these columns, so reloading the same file never creates duplicates
+UPSERT_KEY = ["date", "product_id", "region"]
+
+# Rows read and written per chunk; peak memory depends on this, not on the file size
+DEFAULT_CHUNKSIZE = 50_000
+
+# ==========================
+# 2. CHUNKED, IDEMPOTENT LOAD
+# ==========================
+
+def iter_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams the CSV in chunks with 'date' parsed into real datetimes.
+    """
+    yield from pd.read_csv(csv_path, chunksize=chunksize, parse_dates=["date"])
+
+def upsert_chunk(collection, chunk):
+    """
+    Writes one chunk as unordered upserts keyed on (date, product_id, region).
+    Unordered bulk writes let the server apply them in parallel and keep going past single errors.
+    """
+    operations = [
+        UpdateOne({key: record[key] for key in UPSERT_KEY}, {"$set": record}, upsert=True)
+        for record in chunk.to_dict(orient="records")
+    ]
+    if not operations:
+        return 0
+    result = collection.bulk_write(operations, ordered=False)
+    return result.upserted_count + result.modified_count
+
+def has_string_dates(collection):
+    """
+    True if the collection still holds rows whose 'date' is a string (loads made before dates
+    were parsed). Upserts keyed on datetime dates never match those rows.
+    """
+    return collection.find_one({"date": {"$type": "string"}}, {"_id": 1}) is not None
+
+def dates_migrated(db):
+    """
+    True once a load has confirmed (or made) sales_data free of string dates. The marker spares
+    every later load the has_string_dates() scan, which reads the whole collection when it is clean.
+    """
+    return db[META_COLLECTION].find_one({"_id": DATES_MARKER}, {"_id": 1}) is not None
+
+def mark_dates_migrated(db):
+    db[META_COLLECTION].update_one({"_id": DATES_MARKER}, {"$set": {"migrated": True}}, upsert=True)
+
+def load_csv(db, csv_path, chunksize=DEFAULT_CHUNKSIZE, staging=None):
+    """
+    Loads the CSV into sales_data.
+
+    - staging=False: upserts straight into sales_data (safe to re-run, no delete step).
+    - staging=True: loads into a staging collection, builds indexes there and then renames it
+      over sales_data in one step, so readers never see an empty or half-loaded collection.
+    - staging=None (default): upserts, unless sales_data still has string dates from an older
+      load. Upserting would then add a datetime copy of every row, so the collection is
+      rebuilt through staging instead (a one-time migration). The check runs until a load
+      records in loader_meta that the dates are migrated; later loads skip it.
+    """
+    was_migrated = migrated = dates_migrated(db)
+    if staging is None:
+        staging = not migrated and has_string_dates(db[SALES_COLLECTION])
+        if staging:
+            print("sales_data has string dates from an older load: reloading it through staging")
+        migrated = True  # Clean already, or about to be rebuilt with datetime dates
+    target = db[STAGING_COLLECTION] if staging else db[SALES_COLLECTION]
+    if staging:
+        target.drop()  # Start from a clean staging collection
+
+    # Indexes first, so each upsert looks up its key through (product_id, date)
+    ensure_sales_indexes(target)
+
+    rows = 0
+    for number, chunk in enumerate(iter_chunks(csv_path, chunksize), start=1):
+        rows += len(chunk)
+        upsert_chunk(target, chunk)
+        print(f"  chunk {number}: {rows} rows processed")
+
+    if staging:
+        # Atomically replace sales_data with the fully loaded staging collection
+        target.rename(SALES_COLLECTION, dropTarget=True)
+        migrated = True  # A staging rebuild only holds datetime dates
+    if migrated and not was_migrated:
+        mark_dates_migrated(db)
+
+    return rows
+
+# ==========================
+# 3. RUN THE LOADER
+# ==========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load supply chain CSV data into MongoDB.")
+    parser.add_argument("csv_path", nargs="?", default="supply_chain_data.csv", help="CSV file to load")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    mode = parser.add_mutually_exclusive_group()  # Default: upsert, or staging if sales_data has string dates
+    mode.add_argument("--staging", dest="staging", action="store_true", default=None,
+                      help="Load into a staging collection and swap it in atomically")
+    mode.add_argument("--upsert", dest="staging", action="store_false",
+                      help="Always upsert into sales_data, even over string dates from older loads")
+    args = parser.parse_args()
+
+    # Create a MongoClient instance to connect to the MongoDB server (MONGO_URI)
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+
+    total = load_csv(db, args.csv_path, chunksize=args.chunksize, staging=args.staging)
+
+    # Print confirmation message to indicate successful upload
+    print(f"✅ {total} rows loaded successfully into MongoDB!")
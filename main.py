@@ -1,183 +1,643 @@
-# Import necessary modules
-from fastapi import FastAPI  # FastAPI for building the web API
-from pydantic import BaseModel  # Pydantic for request/response model validation
-from pymongo import MongoClient  # MongoClient to connect to MongoDB
-from bson import json_util  # Utility to convert BSON to JSON
-import pandas as pd  # Pandas for data manipulation
-from prophet import Prophet  # Prophet for time-series forecasting
-import json  # JSON for response formatting
-from transformers import pipeline  # HuggingFace pipeline for NLP tasks
-
-# Initialize the FastAPI app
-app = FastAPI()
-
-# ----------------------------------------
-# === MongoDB Connection Setup ===
-# ----------------------------------------
-
-# Create a connection to the local MongoDB server
-client = MongoClient("mongodb://localhost:27017/")
-
-# Select the database named 'supply_chain_db'
-db = client["supply_chain_db"]
-
-# Select the collection (table equivalent) named 'sales_data'
-collection = db["sales_data"]
-
-# ----------------------------------------
-# === Endpoint 1: Get All Data ===
-# ----------------------------------------
-
-@app.get("/all_data")
-def get_all_data():
-    """
-    Returns all documents from the 'sales_data' collection in MongoDB.
-    Data is converted to JSON-compatible format.
-    """
-    # Fetch all records as a list of documents
-    data = list(collection.find())
-
-    # Convert BSON data to JSON (handles ObjectId and datetime)
-    return json.loads(json_util.dumps(data))
-
-# ----------------------------------------
-# === Endpoint 2: Forecast Sales for Product ===
-# ----------------------------------------
-
-@app.get("/forecast/{product_id}")
-def forecast_demand(product_id: str):
-    """
-    Returns a 30-day demand forecast using Prophet for the specified product.
-    """
-    # Step 1: Get historical sales data for given product_id
-    data = list(collection.find({"product_id": product_id}))
-
-    # Step 2: Handle case when product is not found
-    if not data:
-        return {"error": "Product not found"}
-
-    # Step 3: Convert MongoDB documents into a pandas DataFrame
-    df = pd.DataFrame(data)
-
-    # Convert 'date' column to datetime type
-    df["date"] = pd.to_datetime(df["date"])
-
-    # Sort data by date for time series modeling
-    df = df.sort_values("date")
-
-    # Step 4: Prepare the data for Prophet (rename columns as required)
-    df_prophet = df[["date", "sales_quantity"]].rename(columns={
-        "date": "ds",    # Prophet expects 'ds' for datetime
-        "sales_quantity": "y"  # Prophet expects 'y' for the target variable
-    })
-
-    # Step 5: Initialize and train the Prophet model
-    model = Prophet()
-    model.fit(df_prophet)
-
-    # Step 6: Create a DataFrame for the next 30 days to forecast
-    future = model.make_future_dataframe(periods=30)
-
-    # Step 7: Generate predictions
-    forecast = model.predict(future)
-
-    # Step 8: Select the last 30 days of predictions and return as JSON
-    result = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(30)
-    return json.loads(result.to_json(orient="records", date_format="iso"))
-
-# ----------------------------------------
-# === Endpoint 3: Inventory Optimization ===
-# ----------------------------------------
-
-@app.get("/inventory_optimize/{product_id}")
-def optimize_inventory(product_id: str):
-    """
-    Calculates inventory recommendations using Reorder Point formula.
-    Includes demand forecast, safety stock, and reorder quantity.
-    """
-    # Step 1: Fetch product-specific data
-    data = list(collection.find({"product_id": product_id}))
-    if not data:
-        return {"error": "Product not found"}
-
-    # Step 2: Convert to DataFrame and clean/prepare
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-
-    # Extract current inventory level from latest record
-    current_inventory = int(df.iloc[-1]["inventory_level"])
-
-    # Step 3: Forecast future demand using Prophet
-    df_prophet = df[["date", "sales_quantity"]].rename(columns={"date": "ds", "sales_quantity": "y"})
-    model = Prophet()
-    model.fit(df_prophet)
-    future = model.make_future_dataframe(periods=30)
-    forecast = model.predict(future)
-    next_30_days = forecast.tail(30)
-
-    # Step 4: Calculate inventory metrics
-    lead_time_days = 5  # Days it takes to receive new stock
-    holding_cost_per_unit = 2.5  # Optional; not used in current logic
-
-    # Calculate Safety Stock using 90% confidence (1.65 * std deviation)
-    safety_stock = next_30_days["yhat"].std() * 1.65
-
-    # Average daily demand (used in reorder point calculation)
-    avg_daily_demand = next_30_days["yhat"].mean()
-
-    # Reorder Point formula
-    reorder_point = (avg_daily_demand * lead_time_days) + safety_stock
-
-    # Recommended reorder quantity
-    reorder_qty = reorder_point - current_inventory
-    reorder_qty = max(0, reorder_qty)  # Avoid negative values
-
-    # Return all calculated values in a JSON response
-    return {
-        "product_id": str(product_id),
-        "current_inventory": current_inventory,
-        "predicted_avg_daily_demand": round(float(avg_daily_demand), 2),
-        "predicted_demand_std_dev": round(float(next_30_days['yhat'].std()), 2),
-        "lead_time_days": lead_time_days,
-        "safety_stock": round(float(safety_stock), 2),
-        "reorder_point": round(float(reorder_point), 2),
-        "recommended_reorder_quantity": int(round(reorder_qty)),
-        "note": "Uses Reorder Point formula with safety stock (90% confidence)"
-    }
-
-# ----------------------------------------
-# === Endpoint 4: Market Sentiment Analysis ===
-# ----------------------------------------
-
-# Load HuggingFace transformer pipeline for sentiment analysis
-sentiment_analyzer = pipeline("sentiment-analysis")
-
-@app.post("/market_analysis")
-def analyze_market_trend(text: str):
-    """
-    Uses HuggingFace Transformers to analyze market sentiment from text.
-    Returns sentiment label, confidence score, and suggested action.
-    """
-    # Perform sentiment analysis
-    result = sentiment_analyzer(text)
-
-    # Extract the label (POSITIVE/NEGATIVE) and confidence score
-    sentiment = result[0]['label']
-    score = result[0]['score']
-
-    # Suggest action based on sentiment
-    if sentiment == "NEGATIVE":
-        action = "⚠️ Consider lowering demand forecast or pausing stock."
-    elif sentiment == "POSITIVE":
-        action = "✅ Consider boosting inventory for increased demand."
-    else:
-        action = "🔍 Monitor closely."
-
-    # Return structured response
-    return {
-        "text": text,
-        "sentiment": sentiment,
-        "confidence": round(score, 2),
-        "suggested_action": action
-    }
+# Import necessary modules
+import time  # Measure startup time
+_started_at = time.perf_counter()  # Taken before the heavy imports so the whole startup is measured
+
+import asyncio  # Await pool results and share in-flight forecast fits
+from datetime import date, timedelta  # Roll daily sales totals up into weeks
+from fastapi import FastAPI, Query, Request  # FastAPI for building the web API
+from fastapi.responses import JSONResponse, Response, StreamingResponse  # JSON, raw and streaming HTTP responses
+from pydantic import BaseModel, Field  # Pydantic for request/response model validation
+from pymongo import ASCENDING, DESCENDING  # Sort directions (the async driver shares pymongo's constants)
+from bson import json_util  # Utility to convert BSON to JSON
+from bson import ObjectId  # Used for _id based pagination
+import pandas as pd  # Pandas for data manipulation
+import json  # JSON for response formatting
+from forecast_cache import ForecastCache, CachedForecast  # LRU cache of fitted forecasts per product
+from batch_forecast import (  # Shared with the batch job
+    ensure_forecast_indexes, history_start, FORECAST_PERIODS, MONGO_URI, DB_NAME, SALES_COLLECTION, FORECASTS_COLLECTION
+)
+from mongo_indexes import ensure_sales_indexes  # Index bootstrap for sales_data
+from typing import List, Optional  # Type hints for request bodies
+import numpy as np  # Plan values from the inventory engine
+from inventory_engine import (  # Vectorized safety stock / reorder point / EOQ
+    build_forecast_matrix, build_params, optimize_catalog, inventory_series, LATEST_INVENTORY_PIPELINE,
+    DEFAULT_LEAD_TIME_DAYS, DEFAULT_HOLDING_COST, DEFAULT_ORDERING_COST, DEFAULT_SERVICE_LEVEL,
+)
+from grouped_forecast import (  # Batched (product, region) forecasts with reconciled totals
+    grouped_history_pipeline, build_series_matrix, forecast_grouped, prophet_forecast_many,
+    reconcile, to_long_frame, future_dates, MODELS, RECONCILIATIONS,
+)
+from sentiment_service import SentimentService  # Batched, cached sentiment inference
+from compute_pool import (  # Bounded process pools for CPU-bound work
+    ComputePool, PoolBusy, fit_forecast, score_texts,
+    FORECAST_WORKERS, FORECAST_MAX_QUEUE, NLP_WORKERS, NLP_MAX_QUEUE,
+)
+from startup_budget import report_startup, WARM_MODELS  # Startup-time budget and model warmup switch
+
+# Initialize the FastAPI app
+# All handlers are `async def`: MongoDB is accessed through an async driver, and Prophet fits
+# and transformer inference run in separate process pools, so the event loop only waits on I/O
+# and cheap endpoints like /all_data stay fast while heavy forecasts are running.
+app = FastAPI()
+
+# ----------------------------------------
+# === MongoDB Connection Setup ===
+# ----------------------------------------
+
+def create_mongo_client(uri=MONGO_URI):
+    """
+    Async MongoDB client (Motor). MONGO_URI=mongomock:// uses an in-memory stand-in
+    (mongomock-motor) so the API can be run and tested without a mongod.
+    """
+    if uri.startswith("mongomock://"):
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(uri)
+
+# Create a connection to the MongoDB server (localhost unless MONGO_URI says otherwise)
+client = create_mongo_client()
+
+# Select the database named 'supply_chain_db'
+db = client[DB_NAME]
+
+# Select the collection (table equivalent) named 'sales_data'
+collection = db[SALES_COLLECTION]
+
+# Precomputed forecasts written by batch_forecast.py
+forecasts_collection = db[FORECASTS_COLLECTION]
+
+# ----------------------------------------
+# === CPU-Bound Work: Process Pools with Backpressure ===
+# ----------------------------------------
+
+# Each pool runs a few tasks, queues a bounded number more and rejects the rest with PoolBusy
+forecast_pool = ComputePool("forecast pool", FORECAST_WORKERS, FORECAST_MAX_QUEUE)
+nlp_pool = ComputePool("sentiment pool", NLP_WORKERS, NLP_MAX_QUEUE)
+
+def score_in_pool(texts):
+    """
+    Scores one sentiment batch in the NLP pool (called from the sentiment batching thread).
+    """
+    return nlp_pool.call(score_texts, texts)
+
+# Shared sentiment service: batches concurrent requests and caches results by text in this
+# process; the batches themselves are scored by the model in the NLP worker process.
+sentiment_analyzer = SentimentService(predict_batch=score_in_pool)
+
+@app.exception_handler(PoolBusy)
+async def pool_busy_handler(request: Request, exc: PoolBusy):
+    """
+    Backpressure: a full pool answers 503 right away instead of queueing without bound.
+    """
+    return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": str(exc.retry_after)})
+
+@app.on_event("startup")
+async def on_startup():
+    """
+    Makes sure the sales_data and forecasts indexes exist before serving requests.
+    ML models are loaded on first use unless WARM_MODELS=1, so startup stays fast.
+    """
+    # The index helpers return the driver's create_index calls, which are awaitable here
+    await asyncio.gather(*ensure_sales_indexes(collection), ensure_forecast_indexes(forecasts_collection))
+    if WARM_MODELS:
+        sentiment_analyzer.warmup()
+        nlp_pool.submit(score_texts, ["warmup"])  # Loads the model in the worker; not awaited
+    report_startup("main", _started_at)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    forecast_pool.shutdown()
+    nlp_pool.shutdown()
+
+@app.get("/compute_pool/stats")
+async def get_compute_pool_stats():
+    """
+    Returns running/queued task counts and rejections for both process pools.
+    """
+    return {
+        "forecast": forecast_pool.stats(),
+        "sentiment": {**nlp_pool.stats(), "waiting_texts": sentiment_analyzer.pending},
+    }
+
+# ----------------------------------------
+# === Endpoint 1: Get All Data ===
+# ----------------------------------------
+
+# Page size limits for /all_data (JSON mode)
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+def build_sales_filter(after_id=None, start_date=None, end_date=None, region=None):
+    """
+    Builds a MongoDB filter from the /all_data query parameters.
+    Raises ValueError if after_id is not a valid ObjectId or a date cannot be parsed.
+    """
+    query = {}
+
+    # Cursor-based pagination: only documents after the last _id of the previous page
+    if after_id:
+        if not ObjectId.is_valid(after_id):
+            raise ValueError("Invalid after_id")
+        query["_id"] = {"$gt": ObjectId(after_id)}
+
+    # Date range filter (load_to_mongo.py stores 'date' as a real datetime)
+    if start_date or end_date:
+        query["date"] = {}
+        if start_date:
+            query["date"]["$gte"] = pd.to_datetime(start_date).to_pydatetime()
+        if end_date:
+            query["date"]["$lte"] = pd.to_datetime(end_date).to_pydatetime()
+
+    if region:
+        query["region"] = region
+
+    return query
+
+def build_projection(fields=None):
+    """
+    Turns a comma-separated field list into a MongoDB projection.
+    _id is always returned because it is the pagination cursor.
+    """
+    if not fields:
+        return None
+    return {field.strip(): 1 for field in fields.split(",") if field.strip()}
+
+@app.get("/all_data")
+async def get_all_data(after_id: str = None, limit: int = None, fields: str = None,
+                       start_date: str = None, end_date: str = None, region: str = None,
+                       format: str = "json"):
+    """
+    Returns documents from the 'sales_data' collection in MongoDB.
+
+    - after_id / limit: cursor-based pagination ordered by _id. In JSON mode the _id to pass
+      for the next page is returned in the X-Next-After-Id header (absent on the last page).
+    - fields: comma-separated projection, e.g. "date,product_id,sales_quantity".
+    - start_date / end_date / region: filters.
+    - format=ndjson: streams one JSON document per line instead of a single page,
+      so memory stays flat however large the collection is.
+    """
+    # Step 1: Build the query from the parameters
+    try:
+        query = build_sales_filter(after_id, start_date, end_date, region)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    projection = build_projection(fields)
+    cursor = collection.find(query, projection).sort("_id", 1)
+
+    # Step 2a: Streaming mode - serialize documents one at a time as NDJSON
+    if format == "ndjson":
+        if limit:
+            cursor = cursor.limit(limit)
+        cursor = cursor.batch_size(DEFAULT_PAGE_SIZE)
+
+        async def generate():
+            async for doc in cursor:
+                # json_util handles ObjectId and datetime
+                yield json_util.dumps(doc) + "\n"
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    # Step 2b: JSON mode - return a single bounded page
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    page = await cursor.limit(limit).to_list(length=limit)
+
+    # Step 3: Tell the client where the next page starts
+    headers = {}
+    if len(page) == limit:
+        headers["X-Next-After-Id"] = str(page[-1]["_id"])
+
+    # Convert BSON data to JSON once (handles ObjectId and datetime)
+    return Response(content=json_util.dumps(page), media_type="application/json", headers=headers)
+
+# ----------------------------------------
+# === Aggregation Endpoints (server-side summaries) ===
+# ----------------------------------------
+
+# Granularities accepted by /sales/over_time -> leading characters of the ISO date grouped on.
+# $substr renders datetime dates as ISO strings and keeps string dates from older loads as they
+# are, so both group together; unlike $dateTrunc it also runs under mongomock. Weeks are grouped
+# by day in MongoDB and rolled up here (at most 7 rows per week).
+TIME_UNITS = {"day": 10, "week": 10, "month": 7}
+
+async def run_sales_summary(group_key, start_date=None, end_date=None, region=None, product_id=None):
+    """
+    Groups sales_data by `group_key` inside MongoDB and returns one row per group,
+    so only summarized results are sent over the wire.
+    """
+    match = build_sales_filter(None, start_date, end_date, region)
+    if product_id:
+        match["product_id"] = product_id
+
+    pipeline_stages = [
+        {"$match": match},
+        {"$group": {
+            "_id": group_key,
+            "total_sales": {"$sum": "$sales_quantity"},
+            "avg_inventory": {"$avg": "$inventory_level"},
+            "rows": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    return await collection.aggregate(pipeline_stages).to_list(length=None)
+
+@app.get("/sales/by_product")
+async def sales_by_product(start_date: str = None, end_date: str = None, region: str = None):
+    """
+    Returns total sales, average inventory and row count per product.
+    """
+    try:
+        groups = await run_sales_summary("$product_id", start_date, end_date, region)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    return [
+        {"product_id": g["_id"], "total_sales": g["total_sales"],
+         "avg_inventory": round(g["avg_inventory"] or 0, 2), "rows": g["rows"]}
+        for g in groups
+    ]
+
+@app.get("/sales/by_region")
+async def sales_by_region(start_date: str = None, end_date: str = None, product_id: str = None):
+    """
+    Returns total sales, average inventory and row count per region.
+    """
+    try:
+        groups = await run_sales_summary("$region", start_date, end_date, None, product_id)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    return [
+        {"region": g["_id"], "total_sales": g["total_sales"],
+         "avg_inventory": round(g["avg_inventory"] or 0, 2), "rows": g["rows"]}
+        for g in groups
+    ]
+
+def roll_up_weeks(groups):
+    """
+    Merges daily summary rows into ISO weeks labelled by their Monday.
+    Average inventory is weighted by each day's row count.
+    """
+    weeks = {}
+    for g in groups:
+        day = date.fromisoformat(g["_id"])
+        monday = (day - timedelta(days=day.weekday())).isoformat()
+        week = weeks.setdefault(monday, {"_id": monday, "total_sales": 0, "inventory_sum": 0.0, "rows": 0})
+        week["total_sales"] += g["total_sales"]
+        week["inventory_sum"] += (g["avg_inventory"] or 0) * g["rows"]
+        week["rows"] += g["rows"]
+    return [
+        {"_id": week["_id"], "total_sales": week["total_sales"],
+         "avg_inventory": week["inventory_sum"] / week["rows"] if week["rows"] else None, "rows": week["rows"]}
+        for week in sorted(weeks.values(), key=lambda week: week["_id"])
+    ]
+
+@app.get("/sales/over_time")
+async def sales_over_time(granularity: str = "day", start_date: str = None, end_date: str = None,
+                          region: str = None, product_id: str = None):
+    """
+    Returns total sales per day, week (starting Monday) or month, grouped inside MongoDB.
+    """
+    if granularity not in TIME_UNITS:
+        return {"error": f"granularity must be one of {sorted(TIME_UNITS)}"}
+
+    period = {"$substr": ["$date", 0, TIME_UNITS[granularity]]}
+    try:
+        groups = await run_sales_summary(period, start_date, end_date, region, product_id)
+    except ValueError as exc:
+        return {"error": str(exc)}
+    if granularity == "week":
+        groups = roll_up_weeks(groups)
+    return [
+        {"period": g["_id"] + ("-01" if granularity == "month" else ""), "total_sales": g["total_sales"],
+         "avg_inventory": round(g["avg_inventory"] or 0, 2), "rows": g["rows"]}
+        for g in groups
+    ]
+
+# ----------------------------------------
+# === Forecast Cache ===
+# ----------------------------------------
+
+# Forecasts fitted on demand are cached per product so that /forecast and /inventory_optimize
+# share one fit and repeat dashboard calls skip fitting entirely. Only the forecast frame comes
+# back from the pool, so entries hold no model.
+forecast_cache = ForecastCache(max_entries=128, max_bytes=256 * 1024 * 1024)
+
+async def get_data_fingerprint(product_id):
+    """
+    Returns (fingerprint, latest_record) for a product without loading its full history.
+    The fingerprint is (row count, max date); it changes whenever new sales rows arrive.
+    Returns (None, None) if the product does not exist.
+    """
+    row_count = await collection.count_documents({"product_id": product_id})
+    if row_count == 0:
+        return None, None
+
+    # Latest record gives both the max date and the current inventory level
+    latest = await collection.find_one({"product_id": product_id}, sort=[("date", DESCENDING)])
+    return (row_count, str(latest["date"])), latest
+
+async def fetch_product_history(product_id, start_date=None):
+    """
+    Async twin of batch_forecast.load_product_history: the columns Prophet needs, in date order,
+    from start_date on (the FORECAST_HISTORY_DAYS window) when one is given.
+    """
+    query = {"product_id": product_id}
+    if start_date is not None:
+        query["date"] = {"$gte": start_date.to_pydatetime()}
+    cursor = collection.find(query, {"_id": 0, "date": 1, "sales_quantity": 1})
+    return await cursor.sort("date", ASCENDING).to_list(length=None)
+
+async def fetch_stored_forecast(product_id):
+    """
+    The latest forecast run batch_forecast.py stored for a product as a DataFrame, or None.
+    """
+    latest = await forecasts_collection.find_one(
+        {"product_id": product_id}, {"created_at": 1}, sort=[("created_at", DESCENDING)]
+    )
+    if latest is None:
+        return None
+    cursor = forecasts_collection.find(
+        {"product_id": product_id, "created_at": latest["created_at"]},
+        {"_id": 0, "ds": 1, "yhat": 1, "yhat_lower": 1, "yhat_upper": 1},
+    )
+    rows = await cursor.sort("ds", ASCENDING).to_list(length=None)
+    return pd.DataFrame(rows, columns=["ds", "yhat", "yhat_lower", "yhat_upper"])
+
+# product_id -> task fitting it; concurrent requests for one product share a single fit
+_fits_in_progress = {}
+
+async def fit_and_cache(product_id, fingerprint, latest_date):
+    """
+    Loads the history (same fitting window as the batch job), fits Prophet in the forecast
+    pool and caches the forecast. Raises PoolBusy (503) when the pool's queue is full.
+    """
+    history = await fetch_product_history(product_id, history_start(latest_date))
+    forecast = await forecast_pool.run(fit_forecast, history, FORECAST_PERIODS)
+    return forecast_cache.put(product_id, fingerprint, forecast)
+
+async def get_product_forecast(product_id):
+    """
+    Returns (CachedForecast, latest_record) for a product. Precomputed forecasts from the
+    'forecasts' collection are used first; Prophet is only fitted on demand when the batch
+    job has not covered this product yet. Returns (None, None) if not found.
+    """
+    # Step 1: Cheap fingerprint lookup
+    fingerprint, latest = await get_data_fingerprint(product_id)
+    if fingerprint is None:
+        return None, None
+
+    # Step 2: Prefer the forecast precomputed by batch_forecast.py
+    stored = await fetch_stored_forecast(product_id)
+    if stored is not None and not stored.empty:
+        return CachedForecast(product_id, fingerprint, stored), latest
+
+    # Step 3: Otherwise try the in-process cache
+    entry = forecast_cache.get(product_id, fingerprint)
+    if entry is not None:
+        return entry, latest
+
+    # Step 4: Fit once per product; other requests await the same task. shield() keeps the
+    # fit going for everyone else if the client that started it disconnects.
+    task = _fits_in_progress.get(product_id)
+    if task is None:
+        task = asyncio.ensure_future(fit_and_cache(product_id, fingerprint, latest["date"]))
+        _fits_in_progress[product_id] = task
+        task.add_done_callback(lambda _: _fits_in_progress.pop(product_id, None))
+    return await asyncio.shield(task), latest
+
+@app.get("/forecast_cache/stats")
+async def get_forecast_cache_stats():
+    """
+    Returns forecast cache size and hit/miss counters.
+    """
+    return forecast_cache.stats()
+
+@app.post("/forecast_cache/invalidate")
+async def invalidate_forecast_cache(product_id: str = None):
+    """
+    Drops the cached fit for one product (or all products if no product_id is given).
+    Useful after bulk reloads that keep row count and max date unchanged.
+    """
+    forecast_cache.invalidate(product_id)
+    return {"invalidated": product_id or "all"}
+
+# ----------------------------------------
+# === Endpoint 2: Forecast Sales for Product ===
+# ----------------------------------------
+
+@app.get("/forecast/{product_id}")
+async def forecast_demand(product_id: str):
+    """
+    Returns a 30-day demand forecast using Prophet for the specified product.
+    Reads the precomputed forecast if available, otherwise fits once and caches it.
+    """
+    entry, _ = await get_product_forecast(product_id)
+
+    # Handle case when product is not found
+    if entry is None:
+        return {"error": "Product not found"}
+
+    # Return the cached 30-day predictions as JSON
+    return json.loads(entry.forecast.to_json(orient="records", date_format="iso"))
+
+@app.get("/forecast_grouped")
+async def forecast_demand_grouped(product_id: str = None, periods: int = FORECAST_PERIODS,
+                                  model: str = "ets", reconciliation: str = "ols"):
+    """
+    Forecasts sales per (product, region) plus each product's total, reconciled so that the
+    regions of a product add up to its total (region "ALL"). Covers every product unless
+    product_id is given.
+    model="ets" (default) fits all series at once with batched exponential smoothing;
+    model="prophet" fits one Prophet model per series in the forecast pool and needs a product_id.
+    """
+    if model not in MODELS:
+        return {"error": f"model must be one of {sorted(MODELS)}"}
+    if reconciliation not in RECONCILIATIONS:
+        return {"error": f"reconciliation must be one of {sorted(RECONCILIATIONS)}"}
+    if model == "prophet" and product_id is None:
+        return {"error": "model=prophet fits one model per series; pass a product_id"}
+
+    # Step 1: Daily sales per (product, region), summed inside MongoDB
+    start = time.perf_counter()
+    groups = await collection.aggregate(grouped_history_pipeline(product_id), allowDiskUse=True).to_list(length=None)
+    if not groups:
+        return {"error": "Product not found"}
+    matrix = await asyncio.to_thread(build_series_matrix, groups)
+
+    # Step 2: Fit in the forecast pool (PoolBusy -> 503 when it is full)
+    if model == "ets":
+        forecast = await forecast_pool.run(forecast_grouped, matrix, periods, model, reconciliation)
+    else:
+        # One task per worker, each fitting a slice of the series: a product with more series
+        # than the pool's queue can hold still fits, and all workers are kept busy
+        dates = list(matrix.columns)
+        chunks = np.array_split(matrix.to_numpy(), min(forecast_pool.workers, len(matrix)))
+        results = await asyncio.gather(*(
+            forecast_pool.run(prophet_forecast_many, dates, chunk, periods) for chunk in chunks
+        ))
+
+        def reconcile_prophet():
+            yhat, half_width = reconcile(matrix.index, np.concatenate([r[0] for r in results]),
+                                         np.concatenate([r[1] for r in results]), reconciliation)
+            return to_long_frame(matrix.index, future_dates(matrix, periods), yhat, half_width)
+
+        forecast = await asyncio.to_thread(reconcile_prophet)
+
+    return {
+        "series": len(matrix),
+        "model": model,
+        "reconciliation": reconciliation,
+        "forecast": json.loads(forecast.to_json(orient="records", date_format="iso")),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+# ----------------------------------------
+# === Endpoint 3: Inventory Optimization ===
+# ----------------------------------------
+
+def round_plan_value(value):
+    """
+    JSON-friendly value from an optimize_catalog row (NaN, e.g. EOQ without holding cost, becomes None).
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+@app.get("/inventory_optimize/{product_id}")
+async def optimize_inventory(product_id: str, lead_time_days: float = Query(DEFAULT_LEAD_TIME_DAYS, ge=0),
+                             holding_cost_per_unit: float = Query(DEFAULT_HOLDING_COST, ge=0),
+                             ordering_cost: float = Query(DEFAULT_ORDERING_COST, ge=0),
+                             service_level: float = Query(DEFAULT_SERVICE_LEVEL, gt=0, lt=1)):
+    """
+    Calculates inventory recommendations for one product with the catalog engine:
+    safety stock at the given service level, reorder point over the lead time, EOQ
+    (using the holding and ordering costs) and the quantity to order now. The engine
+    keeps the service level within [0.5, 0.9999]; the response reports the level used.
+    """
+    # Step 1: Get the (cached) forecast and the latest record for this product
+    entry, latest = await get_product_forecast(product_id)
+    if entry is None:
+        return {"error": "Product not found"}
+
+    # Step 2: Same vectorized computation as the catalog endpoint, on a one-product matrix
+    matrix = build_forecast_matrix(entry.forecast.assign(product_id=product_id))
+    params = build_params([product_id], lead_time_days=lead_time_days, holding_cost_per_unit=holding_cost_per_unit,
+                          ordering_cost=ordering_cost, service_level=service_level)
+    inventory = pd.Series({product_id: latest["inventory_level"]}, dtype=float)
+    plan = optimize_catalog(matrix, inventory, params).iloc[0]
+
+    # Step 3: Return all calculated values in a JSON response
+    return {
+        "product_id": str(product_id),
+        **{column: round_plan_value(value) for column, value in plan.items()},
+        "service_level": float(plan["service_level"]),  # Level actually used (not rounded to 2 places)
+        "current_inventory": int(latest["inventory_level"]),
+        "note": f"Reorder point with safety stock at {plan['service_level'] * 100:g}% service level; order size from EOQ",
+    }
+
+class ProductInventoryParams(BaseModel):
+    product_id: str
+    lead_time_days: Optional[float] = Field(None, ge=0)         # Missing values use the request-level defaults
+    holding_cost_per_unit: Optional[float] = Field(None, ge=0)  # Per unit per year
+    ordering_cost: Optional[float] = Field(None, ge=0)          # Per order
+    service_level: Optional[float] = Field(None, gt=0, lt=1)    # Used within [0.5, 0.9999]
+
+class InventoryPlanRequest(BaseModel):
+    product_ids: Optional[List[str]] = None  # None plans the whole catalog
+    lead_time_days: float = Field(DEFAULT_LEAD_TIME_DAYS, ge=0)
+    holding_cost_per_unit: float = Field(DEFAULT_HOLDING_COST, ge=0)
+    ordering_cost: float = Field(DEFAULT_ORDERING_COST, ge=0)
+    service_level: float = Field(DEFAULT_SERVICE_LEVEL, gt=0, lt=1)  # Used within [0.5, 0.9999]
+    products: List[ProductInventoryParams] = []  # Per-product overrides
+
+@app.post("/inventory_optimize/batch")
+async def optimize_inventory_batch(body: InventoryPlanRequest):
+    """
+    Plans inventory for many products (or the whole catalog) in one pass over the stored
+    forecasts from batch_forecast.py: two queries and one vectorized computation, no fits.
+    Products without a stored forecast are listed under "missing_forecasts".
+    """
+    start = time.perf_counter()
+    match = {"product_id": {"$in": body.product_ids}} if body.product_ids else {}
+
+    # Step 1: Every requested product's stored forecast rows and latest inventory level
+    rows = await forecasts_collection.find(
+        match, {"_id": 0, "product_id": 1, "ds": 1, "yhat": 1, "created_at": 1}
+    ).to_list(length=None)
+    pipeline_stages = ([{"$match": match}] if match else []) + LATEST_INVENTORY_PIPELINE
+    groups = await collection.aggregate(pipeline_stages, allowDiskUse=True).to_list(length=None)
+
+    # Step 2: Pivot and compute on a worker thread so the event loop stays free on large catalogs
+    def plan_catalog():
+        matrix = build_forecast_matrix(rows)
+        overrides = [product.dict(exclude_none=True) for product in body.products]
+        params = build_params(matrix.index, overrides or None, lead_time_days=body.lead_time_days,
+                              holding_cost_per_unit=body.holding_cost_per_unit,
+                              ordering_cost=body.ordering_cost, service_level=body.service_level)
+        plan = optimize_catalog(matrix, inventory_series(groups), params)
+        return json.loads(plan.round(2).reset_index().to_json(orient="records"))
+
+    records = await asyncio.to_thread(plan_catalog)
+    planned = {record["product_id"] for record in records}
+    requested = body.product_ids or [g["_id"] for g in groups]
+    return {
+        "products": records,
+        "missing_forecasts": [product_id for product_id in requested if product_id not in planned],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+# ----------------------------------------
+# === Endpoint 4: Market Sentiment Analysis ===
+# ----------------------------------------
+
+
+class MarketTexts(BaseModel):
+    texts: List[str]  # Market news or customer feedback texts to analyze in one call
+
+def suggest_action(sentiment):
+    """
+    Suggests an inventory action for a sentiment label.
+    """
+    if sentiment == "NEGATIVE":
+        return "⚠️ Consider lowering demand forecast or pausing stock."
+    elif sentiment == "POSITIVE":
+        return "✅ Consider boosting inventory for increased demand."
+    return "🔍 Monitor closely."
+
+def build_market_response(text, result):
+    """
+    Formats one sentiment result as the /market_analysis response.
+    """
+    return {
+        "text": text,
+        "sentiment": result['label'],
+        "confidence": round(result['score'], 2),
+        "suggested_action": suggest_action(result['label'])
+    }
+
+@app.post("/market_analysis")
+async def analyze_market_trend(text: str):
+    """
+    Uses HuggingFace Transformers to analyze market sentiment from text.
+    Returns sentiment label, confidence score, and suggested action.
+    """
+    # Backpressure on the micro-batching queue (the pool itself is bounded too)
+    if sentiment_analyzer.pending >= NLP_MAX_QUEUE:
+        raise PoolBusy(nlp_pool.name)
+
+    # Perform sentiment analysis (micro-batched with other concurrent requests, scored in the NLP pool)
+    result = await asyncio.wrap_future(sentiment_analyzer.submit(text))
+
+    # Return structured response
+    return build_market_response(text, result)
+
+@app.post("/market_analysis/batch")
+async def analyze_market_trends(body: MarketTexts):
+    """
+    Analyzes many texts in one call using batched forward passes.
+    """
+    # analyze_many blocks on the NLP pool batch by batch, so it runs on a thread, not the event loop
+    results = await asyncio.to_thread(sentiment_analyzer.analyze_many, body.texts)
+    return [build_market_response(text, result) for text, result in zip(body.texts, results)]
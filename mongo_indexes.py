@@ -0,0 +1,93 @@
+# Import necessary modules
+import argparse  # Command-line options for the index check
+import os  # Read MongoDB URI from the environment
+from datetime import datetime  # Date bound for the windowed history query
+from pymongo import MongoClient, ASCENDING  # MongoDB access and index directions
+
+# ----------------------------------------
+# === Configuration ===
+# ----------------------------------------
+
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = "supply_chain_db"
+SALES_COLLECTION = "sales_data"
+
+# Compound indexes for the hot queries:
+# - (product_id, date): forecasts, fingerprints and per-product date ranges
+# - (region, date): region filters and regional summaries
+SALES_INDEXES = [
+    ([("product_id", ASCENDING), ("date", ASCENDING)], "product_id_date"),
+    ([("region", ASCENDING), ("date", ASCENDING)], "region_date"),
+]
+
+# ----------------------------------------
+# === Index Bootstrap ===
+# ----------------------------------------
+
+def ensure_sales_indexes(collection):
+    """
+    Creates the sales_data indexes if they do not exist yet.
+    create_index is a no-op when the index is already there, so this is safe to run on every start.
+    With an async driver collection the returned list holds awaitables (see main.py startup).
+    """
+    return [collection.create_index(keys, name=name) for keys, name in SALES_INDEXES]
+
+# ----------------------------------------
+# === Query Plan Check ===
+# ----------------------------------------
+
+def plan_stages(plan):
+    """
+    Returns all stage names in a winning plan (e.g. ['FETCH', 'IXSCAN']).
+    """
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    # Newer servers wrap the classic plan in queryPlan
+    if "queryPlan" in plan:
+        stages += plan_stages(plan["queryPlan"])
+    return [stage for stage in stages if stage]
+
+def check_forecast_query_plans(collection, product_id):
+    """
+    Explains the queries used by the forecast endpoints and returns {query_name: stages}.
+    None of them should contain COLLSCAN once the indexes exist.
+    """
+    queries = {
+        # History loaded for fitting, sorted by date inside MongoDB
+        "history": collection.find({"product_id": product_id}, {"_id": 0, "date": 1, "sales_quantity": 1})
+                             .sort("date", ASCENDING),
+        # Same history limited to a FORECAST_HISTORY_DAYS window (index range on date)
+        "history_window": collection.find({"product_id": product_id, "date": {"$gte": datetime(2000, 1, 1)}},
+                                          {"_id": 0, "date": 1, "sales_quantity": 1}).sort("date", ASCENDING),
+        # Latest record used for the data fingerprint and current inventory
+        "latest": collection.find({"product_id": product_id}).sort("date", -1).limit(1),
+    }
+    return {
+        name: plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        for name, cursor in queries.items()
+    }
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create sales_data indexes and verify query plans.")
+    parser.add_argument("--check", metavar="PRODUCT_ID", default=None,
+                        help="Explain the forecast queries for this product and fail on COLLSCAN")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME][SALES_COLLECTION]
+    print(f"✅ Indexes ready: {ensure_sales_indexes(collection)}")
+
+    if args.check:
+        plans = check_forecast_query_plans(collection, args.check)
+        for name, stages in plans.items():
+            print(f"{name}: {' -> '.join(stages)}")
+        if any("COLLSCAN" in stages for stages in plans.values()):
+            raise SystemExit("❌ Forecast queries still use a collection scan")
+        print("✅ No COLLSCAN in forecast queries")
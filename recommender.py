@@ -1,7 +1,9 @@
-def generate_recommendations(df):
+def generate_recommendations(df, mean_usage=None, max_usage=None):
     recs = []
-    if df['usage_kwh'].mean() > 1.5:
+    mean_usage = df['usage_kwh'].mean() if mean_usage is None else mean_usage
+    max_usage = df['usage_kwh'].max() if max_usage is None else max_usage
+    if mean_usage > 1.5:
         recs.append("Consider using high-power devices during off-peak hours.")
-        if df['usage_kwh'].max() > 3:
+        if max_usage > 3:
             recs.append("Large spikes detected – check air conditioning usage.")
     return recs
\ No newline at end of file
@@ -0,0 +1,301 @@
+# === Import Required Libraries ===
+import argparse  # Command-line options for building the index and running the benchmark
+import json  # Small metadata file stored next to the embeddings
+import os  # File paths and atomic replace
+import time  # Latency measurements for the benchmark
+import numpy as np  # Memory-mapped embedding matrix and vectorized top-k
+import cs  # TF-IDF index and resource table (embedding rows follow the same order)
+
+# === Step 1: Settings ===
+MODEL_NAME = 'all-MiniLM-L6-v2'  # Same sentence-transformer the HomeWatt apps use
+EMBED_DIR = "embedding_index"    # Folder for the float16 embedding matrix and IVF lists
+ENCODE_BATCH_SIZE = 256          # Resources encoded per forward pass when building
+SCAN_ROWS = 16_384               # Rows converted to float32 at a time during exact search
+HYBRID_ALPHA = 0.5               # Weight of the semantic score in hybrid mode (rest is TF-IDF)
+HYBRID_CANDIDATES = 10           # Hybrid re-scores top_n * this many candidates from each mode
+
+# The model is only loaded when a query or build actually needs it
+_model = None
+
+def get_model():
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(MODEL_NAME)
+    return _model
+
+def encode(texts, batch_size=ENCODE_BATCH_SIZE):
+    # Unit-length embeddings, so a dot product is cosine similarity
+    return get_model().encode(list(texts), batch_size=batch_size, normalize_embeddings=True,
+                              convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+
+def _top_k(scores, k):
+    # Indices of the k largest scores, best first (argpartition, then sort only those k)
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(-scores[best])]
+
+# === Step 2: Embedding Index ===
+# Embeddings are stored as a float16 .npy file and memory-mapped on load. Exact search scans
+# the matrix in blocks and keeps a running top-k, so memory stays bounded for big catalogs.
+# An optional IVF index (k-means lists) restricts the scan to the `nprobe` closest lists.
+IVF_FILES = ("centroids.npy", "list_order.npy", "list_offsets.npy")  # Only valid for the rows they were built on
+
+class EmbeddingIndex:
+
+    def __init__(self, embeddings, centroids=None, list_order=None, list_offsets=None):
+        self.embeddings = embeddings      # resources x dims, float16 (memory-mapped)
+        self.centroids = centroids        # IVF list centres, float32 (None if no IVF)
+        self.list_order = list_order      # Resource positions grouped by IVF list
+        self.list_offsets = list_offsets  # Start of each list in list_order
+
+    @classmethod
+    def build(cls, resources, index_dir=EMBED_DIR, n_lists=None):
+        """Encodes title/description/subject in batches straight into a float16 memmap file."""
+        os.makedirs(index_dir, exist_ok=True)
+        texts = cs.resource_text(resources).tolist()
+        first = encode(texts[:ENCODE_BATCH_SIZE])
+        tmp_path = os.path.join(index_dir, "embeddings.tmp.npy")
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16, shape=(len(texts), first.shape[1]))
+        matrix[:len(first)] = first
+        for start in range(len(first), len(texts), ENCODE_BATCH_SIZE):
+            matrix[start:start + ENCODE_BATCH_SIZE] = encode(texts[start:start + ENCODE_BATCH_SIZE])
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, os.path.join(index_dir, "embeddings.npy"))
+
+        index = cls(np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r"))
+        if n_lists:
+            index.build_ivf(n_lists, index_dir)
+        else:
+            for name in IVF_FILES:  # Lists from an earlier build would point at the old rows
+                if os.path.exists(os.path.join(index_dir, name)):
+                    os.remove(os.path.join(index_dir, name))
+        with open(os.path.join(index_dir, "meta.json"), "w") as f:
+            json.dump({"model": MODEL_NAME, "rows": len(texts), "n_lists": n_lists}, f)
+        return index
+
+    def build_ivf(self, n_lists, index_dir=EMBED_DIR, sample_size=100_000):
+        """Clusters the embeddings into n_lists groups (k-means on a sample) for approximate search."""
+        from sklearn.cluster import MiniBatchKMeans
+        rng = np.random.default_rng(0)
+        n_rows = len(self.embeddings)
+        sample = np.sort(rng.choice(n_rows, size=min(sample_size, n_rows), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=0, batch_size=4096, n_init=3)
+        kmeans.fit(np.asarray(self.embeddings[sample], dtype=np.float32))
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+        # Assign every resource to its closest centre, block by block
+        assignment = np.concatenate([
+            np.argmax(np.asarray(self.embeddings[start:start + SCAN_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+            for start in range(0, n_rows, SCAN_ROWS)
+        ])
+        self.centroids = centroids
+        self.list_order = np.argsort(assignment, kind="stable")
+        self.list_offsets = np.searchsorted(assignment[self.list_order], np.arange(n_lists + 1))
+        np.save(os.path.join(index_dir, "centroids.npy"), self.centroids)
+        np.save(os.path.join(index_dir, "list_order.npy"), self.list_order)
+        np.save(os.path.join(index_dir, "list_offsets.npy"), self.list_offsets)
+
+    @classmethod
+    def load(cls, index_dir=EMBED_DIR):
+        """Opens a built index; IVF lists are only used if meta.json says they belong to these embeddings."""
+        embeddings = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r")
+        meta_path = os.path.join(index_dir, "meta.json")
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        if not meta.get("n_lists") or meta.get("rows") != len(embeddings) \
+                or not all(os.path.exists(os.path.join(index_dir, name)) for name in IVF_FILES):
+            return cls(embeddings)
+        centroids = np.load(os.path.join(index_dir, "centroids.npy"))
+        list_order = np.load(os.path.join(index_dir, "list_order.npy"), mmap_mode="r")
+        if len(centroids) != meta["n_lists"] or len(list_order) != len(embeddings):
+            return cls(embeddings)  # Stale lists: fall back to exact search
+        return cls(embeddings, centroids, list_order, np.load(os.path.join(index_dir, "list_offsets.npy")))
+
+    def exact_scores(self, positions, query_vector):
+        # Cosine scores for a subset of resources, read in file order for better locality
+        positions = np.sort(positions)
+        return positions, np.asarray(self.embeddings[positions], dtype=np.float32) @ query_vector
+
+    def search_many(self, query_vectors, top_n=5, nprobe=None, deleted=None):
+        """
+        Returns, per query, the positions of the top_n resources by cosine similarity.
+        nprobe: with an IVF index, only scan that many closest lists (approximate, much faster).
+        """
+        if nprobe and self.centroids is not None:
+            return [self._search_ivf(vector, top_n, nprobe, deleted) for vector in query_vectors]
+
+        # Exact search: scan in blocks and keep a running top-k per query
+        n_queries = len(query_vectors)
+        best_pos = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        for start in range(0, len(self.embeddings), SCAN_ROWS):
+            block = np.asarray(self.embeddings[start:start + SCAN_ROWS], dtype=np.float32)
+            scores = query_vectors @ block.T  # queries x block rows
+            if deleted is not None:
+                scores[:, deleted[start:start + len(block)]] = -np.inf
+            # Best top_n of this block, merged with the best so far
+            if scores.shape[1] > top_n:
+                part = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+            else:
+                part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_pos = np.concatenate([best_pos, part + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+            if best_scores.shape[1] > top_n:
+                keep = np.argpartition(-best_scores, top_n - 1, axis=1)[:, :top_n]
+                best_pos = np.take_along_axis(best_pos, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_pos = np.take_along_axis(best_pos, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [positions[np.isfinite(scores)] for positions, scores in zip(best_pos, best_scores)]
+
+    def _search_ivf(self, query_vector, top_n, nprobe, deleted):
+        lists = _top_k(self.centroids @ query_vector, nprobe)
+        candidates = np.concatenate([
+            self.list_order[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists
+        ])
+        if deleted is not None:
+            candidates = candidates[~deleted[candidates]]
+        candidates, scores = self.exact_scores(candidates, query_vector)
+        return candidates[_top_k(scores, top_n)]
+
+# === Step 3: Load the Saved Index (or Build It Once) ===
+_embedding_index = None
+_embedding_generation = None  # (cs.index object, its generation) the embedding rows line up with
+
+def get_embedding_index(index_dir=EMBED_DIR, n_lists=None):
+    """
+    Maps the saved embeddings, rebuilding them if the model or the resource table changed,
+    including in-process changes: after cs.index.compact() (e.g. via save()) the resource
+    positions shift and the loaded rows would point at the wrong resources.
+    """
+    global _embedding_index, _embedding_generation
+    shifted = _embedding_index is not None and _embedding_generation != (id(cs.index), cs.index.generation)
+    if _embedding_index is None or shifted:
+        meta_path = os.path.join(index_dir, "meta.json")
+        resources_path = os.path.join(cs.INDEX_DIR, "resources.pkl")
+        current = False
+        if not shifted and os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(resources_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            current = meta["model"] == MODEL_NAME and meta["rows"] == len(cs.index.resources)
+        if current:
+            _embedding_index = EmbeddingIndex.load(index_dir)
+        else:
+            cs.index.compact()  # Embedding rows must line up with the TF-IDF resource positions
+            _embedding_index = EmbeddingIndex.build(cs.index.resources, index_dir, n_lists)
+        _embedding_generation = (id(cs.index), cs.index.generation)
+    return _embedding_index
+
+def _deleted_mask(n_rows):
+    """cs.index's deleted flags for the embedding rows; rows it no longer has count as deleted."""
+    deleted = np.ones(n_rows, dtype=bool)
+    current = np.asarray(cs.index.deleted[:n_rows])
+    deleted[:len(current)] = current
+    return deleted
+
+# === Step 4: Semantic and Hybrid Search ===
+def semantic_search(queries, top_n=5, nprobe=None):
+    embedding_index = get_embedding_index()
+    deleted = _deleted_mask(len(embedding_index.embeddings))
+    return embedding_index.search_many(encode(queries), top_n, nprobe, deleted)
+
+def hybrid_search(queries, top_n=5, alpha=HYBRID_ALPHA, nprobe=None):
+    """
+    Combines semantic and TF-IDF cosine scores: alpha * semantic + (1 - alpha) * tfidf.
+    Candidates are the union of each mode's top results, then re-scored with both.
+    """
+    embedding_index = get_embedding_index()
+    deleted = _deleted_mask(len(embedding_index.embeddings))
+    query_vectors = encode(queries)
+    n_candidates = top_n * HYBRID_CANDIDATES
+    semantic_top = embedding_index.search_many(query_vectors, n_candidates, nprobe, deleted)
+    lexical_scores = cs.index.score_many(queries)  # One sparse matmul for both candidates and scores
+    lexical_top = cs.index.top_positions(lexical_scores, n_candidates)
+
+    results = []
+    for row, (vector, sem_pos, lex_pos) in enumerate(zip(query_vectors, semantic_top, lexical_top)):
+        candidates = np.union1d(sem_pos, lex_pos[lex_pos < len(embedding_index.embeddings)])
+        if len(candidates) == 0:
+            results.append(candidates)
+            continue
+        candidates, semantic = embedding_index.exact_scores(candidates, vector)
+
+        # Look up each candidate's TF-IDF score in the query's sparse row (0 if no shared words)
+        lexical = np.zeros(len(candidates), dtype=np.float32)
+        lexical_row = lexical_scores[row]
+        if lexical_row.nnz:
+            lexical_row.sort_indices()
+            slot = np.minimum(np.searchsorted(lexical_row.indices, candidates), lexical_row.nnz - 1)
+            found = lexical_row.indices[slot] == candidates
+            lexical[found] = lexical_row.data[slot[found]]
+
+        combined = alpha * semantic + (1 - alpha) * lexical
+        results.append(candidates[_top_k(combined, top_n)])
+    return results
+
+def get_recommendations_for_queries(queries, top_n=5, mode="semantic", nprobe=None):
+    if mode == "semantic":
+        results = semantic_search(queries, top_n, nprobe)
+    elif mode == "hybrid":
+        results = hybrid_search(queries, top_n, nprobe=nprobe)
+    else:
+        raise ValueError(f"Unknown search mode: {mode}")
+    return [cs.index.records(positions) for positions in results]
+
+# === Step 5: Benchmark (recall and latency of each mode) ===
+# Each query is a sampled resource's title and the "right answer" is that resource,
+# so recall@k is the share of queries whose resource appears in the top k.
+def benchmark(n_queries=200, top_n=10, nprobe=8):
+    rng = np.random.default_rng(0)
+    resources = cs.index.resources
+    targets = rng.choice(len(resources), size=min(n_queries, len(resources)), replace=False)
+    queries = resources['title'].iloc[targets].tolist()
+
+    modes = {
+        "tfidf": lambda: cs.index.search_many(queries, top_n),
+        "semantic (exact)": lambda: semantic_search(queries, top_n),
+        "hybrid": lambda: hybrid_search(queries, top_n),
+    }
+    if get_embedding_index().centroids is not None:
+        modes[f"semantic (ivf, nprobe={nprobe})"] = lambda: semantic_search(queries, top_n, nprobe)
+
+    get_model()  # Exclude model loading from the timings
+    exact = None
+    for name, run in modes.items():
+        start = time.perf_counter()
+        results = run()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([target in result for target, result in zip(targets, results)])
+        line = f"{name:28s} recall@{top_n}: {recall:.3f}  latency: {elapsed_ms:.2f} ms/query"
+        if name == "semantic (exact)":
+            exact = results
+        elif name.startswith("semantic (ivf") and exact is not None:
+            overlap = np.mean([len(np.intersect1d(a, b)) / max(len(a), 1) for a, b in zip(exact, results)])
+            line += f"  overlap with exact: {overlap:.3f}"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic search over learning resources.")
+    parser.add_argument("--build", action="store_true", help="(Re)build the embedding index")
+    parser.add_argument("--ivf-lists", type=int, default=None, help="Also build an IVF index with this many lists")
+    parser.add_argument("--benchmark", action="store_true", help="Compare recall and latency of all modes")
+    parser.add_argument("--query", default="I want to learn about algebra or math equations")
+    args = parser.parse_args()
+
+    if args.build:
+        cs.index.compact()
+        _embedding_index = EmbeddingIndex.build(cs.index.resources, EMBED_DIR, args.ivf_lists)
+    if args.benchmark:
+        benchmark()
+    else:
+        for res in get_recommendations_for_queries([args.query], mode="hybrid")[0]:
+            print(res)
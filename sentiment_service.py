@@ -0,0 +1,211 @@
+# Import necessary modules
+import os  # Read the inference backend from the environment
+import threading  # Background batching thread and locks
+import queue  # Thread-safe queue for incoming requests
+import time  # Measure how long a batch has been waiting
+from collections import OrderedDict  # LRU cache of recent results
+from concurrent.futures import Future  # Lets each caller wait for its own result
+
+# transformers / torch / optimum are imported only when the model is first needed,
+# so processes that never run sentiment analysis do not pay for them.
+
+# Default model of pipeline("sentiment-analysis"), named explicitly so every backend loads the same one
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Inference backend: "pytorch" (default), "quantized" (dynamic int8 on CPU) or "onnx" (ONNX Runtime)
+DEFAULT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "pytorch")
+
+# ----------------------------------------
+# === Helpers ===
+# ----------------------------------------
+
+def normalize_text(text):
+    """
+    Cache key for a text: surrounding whitespace stripped and inner whitespace collapsed.
+    Case is kept because cased models can score "GOOD" and "good" differently.
+    """
+    return " ".join(str(text).split())
+
+def load_sentiment_pipeline(task="sentiment-analysis", model=None, backend=DEFAULT_BACKEND):
+    """
+    Builds the HuggingFace pipeline for the chosen backend.
+    - pytorch:   the regular model
+    - quantized: Linear layers converted to dynamic int8 (smaller and faster on CPU)
+    - onnx:      model exported to ONNX and run with ONNX Runtime (requires optimum[onnxruntime])
+    """
+    from transformers import pipeline, AutoTokenizer
+
+    model = model or DEFAULT_MODEL
+    if backend == "pytorch":
+        return pipeline(task, model=model)
+
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    if backend == "quantized":
+        import torch
+        from transformers import AutoModelForSequenceClassification
+        base = AutoModelForSequenceClassification.from_pretrained(model)
+        quantized = torch.quantization.quantize_dynamic(base, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline(task, model=quantized, tokenizer=tokenizer)
+
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        onnx_model = ORTModelForSequenceClassification.from_pretrained(model, export=True)
+        return pipeline(task, model=onnx_model, tokenizer=tokenizer)
+
+    raise ValueError(f"Unknown sentiment backend: {backend}")
+
+# ----------------------------------------
+# === Batched, Cached Sentiment Service ===
+# ----------------------------------------
+
+class SentimentService:
+    """
+    Shared sentiment inference for main.py and api.py.
+
+    Single requests arriving within `max_wait_ms` of each other are gathered into one
+    batched forward pass (dynamic micro-batching), and results are kept in an LRU cache
+    keyed on the normalized text. analyze_many() scores a whole list in one call.
+
+    The model is loaded lazily on first use, or up front by calling warmup().
+    With predict_batch (a function taking a list of texts and returning their results),
+    batches are scored by that function instead, e.g. in a process pool, and no model is
+    loaded in this process; batching and caching still happen here.
+    """
+
+    def __init__(self, task="sentiment-analysis", model=None, backend=DEFAULT_BACKEND,
+                 max_batch_size=32, max_wait_ms=5, cache_size=4096, predict_batch=None):
+        self.task = task
+        self.model = model
+        self.backend = backend
+        self.max_batch_size = max_batch_size  # Upper bound on texts per forward pass
+        self.max_wait = max_wait_ms / 1000.0  # How long to wait for more requests before running a batch
+        self.cache_size = cache_size          # Number of results kept in the LRU cache
+        self._pipeline = None                 # Created on first use
+        self._predict_batch = predict_batch   # Scores batches elsewhere instead of self._pipeline
+        self._load_lock = threading.Lock()
+        self._cache = OrderedDict()           # normalized text -> {"label": ..., "score": ...}
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()           # (normalized text, Future) waiting to be batched
+        self._worker = None                   # Batching thread, started with the model
+
+    # === Public API ===
+
+    @property
+    def loaded(self):
+        return self._pipeline is not None or (self._predict_batch is not None and self._worker is not None)
+
+    @property
+    def pending(self):
+        """Single-text requests waiting for the next micro-batch."""
+        return self._queue.qsize()
+
+    def warmup(self):
+        """
+        Loads the model and starts the batching thread now instead of on the first request.
+        """
+        if self.loaded:
+            return
+        with self._load_lock:
+            if not self.loaded:
+                if self._predict_batch is None:
+                    self._pipeline = load_sentiment_pipeline(self.task, self.model, self.backend)
+                self._worker = threading.Thread(target=self._run_batches, name="sentiment-batcher", daemon=True)
+                self._worker.start()
+
+    def analyze(self, text):
+        """
+        Returns {"label": ..., "score": ...} for one text.
+        Blocks until the micro-batch containing this text has run (a few ms extra at most).
+        """
+        return self.submit(text).result()
+
+    def submit(self, text):
+        """
+        Non-blocking version of analyze(): returns a Future for the result
+        (already completed on a cache hit). Async callers can await it with asyncio.wrap_future.
+        """
+        future = Future()
+        key = normalize_text(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        self.warmup()
+        self._queue.put((key, future))
+        return future
+
+    def analyze_many(self, texts):
+        """
+        Returns one result per text, scoring all uncached texts in batched forward passes.
+        """
+        keys = [normalize_text(text) for text in texts]
+        results = {key: self._cache_get(key) for key in keys}
+
+        # Score each distinct uncached text once
+        missing = [key for key, value in results.items() if value is None]
+        if missing:
+            self.warmup()
+        for start in range(0, len(missing), self.max_batch_size):
+            chunk = missing[start:start + self.max_batch_size]
+            for key, result in zip(chunk, self._predict(chunk)):
+                results[key] = result
+
+        return [results[key] for key in keys]
+
+    # === Internals ===
+
+    def _predict(self, keys):
+        """
+        Runs one forward pass over a list of texts and caches the results.
+        """
+        if self._predict_batch is not None:
+            outputs = self._predict_batch(keys)
+        else:
+            outputs = self._pipeline(keys, batch_size=len(keys), truncation=True)
+        for key, output in zip(keys, outputs):
+            self._cache_put(key, output)
+        return outputs
+
+    def _run_batches(self):
+        """
+        Background loop: take the first waiting request, collect more until the batch is
+        full or max_wait has passed, then run them all in one forward pass.
+        """
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Identical texts in the same batch are only scored once
+            unique_keys = list(dict.fromkeys(key for key, _ in batch))
+            try:
+                scored = dict(zip(unique_keys, self._predict(unique_keys)))
+            except Exception as exc:  # Report the failure to every waiting caller
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for key, future in batch:
+                future.set_result(scored[key])
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, key, result):
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,59 @@
+# Import necessary modules
+import argparse  # Command-line options
+import os  # Read the budget from the environment
+import subprocess  # Import each app in a fresh interpreter
+import sys  # Path of the current Python interpreter
+import time  # Measure elapsed time
+
+# ----------------------------------------
+# === Startup Budget ===
+# ----------------------------------------
+
+# Maximum seconds an API module may take from first import to ready (without warmed models)
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "3.0"))
+
+# Set WARM_MODELS=1 to load ML models in the startup hook instead of on first use
+WARM_MODELS = os.environ.get("WARM_MODELS", "0") == "1"
+
+def report_startup(app_name, started_at, budget=STARTUP_BUDGET_SECONDS):
+    """
+    Prints how long an app took to start and warns when it is over budget.
+    Call from a FastAPI startup hook with the perf_counter value taken at the top of the module.
+    """
+    elapsed = time.perf_counter() - started_at
+    status = "✅" if elapsed <= budget else "⚠️ over budget"
+    print(f"{status} {app_name} started in {elapsed:.2f}s (budget {budget:.2f}s)")
+    return elapsed
+
+def measure_import(module_name):
+    """
+    Imports a module in a fresh interpreter and returns the import time in seconds.
+    A new process is used so earlier imports in this process do not hide the cost.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module_name}; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+# ----------------------------------------
+# === Command Line Entry Point ===
+# ----------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check API import times against the startup budget.")
+    parser.add_argument("modules", nargs="*", default=["main", "api"], help="Modules to import")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="Budget in seconds")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module_name in args.modules:
+        seconds = measure_import(module_name)
+        ok = seconds <= args.budget
+        over_budget = over_budget or not ok
+        print(f"{'✅' if ok else '❌'} import {module_name}: {seconds:.2f}s (budget {args.budget:.2f}s)")
+
+    if over_budget:
+        raise SystemExit(1)
@@ -1,9 +1,10 @@
 # === Import Required Libraries ===
 import streamlit as st       # Streamlit is used to build interactive web apps with Python
-import requests              # Used to send HTTP requests to FastAPI backend
+from api_client import get_client  # Pooled, cached HTTP client for the FastAPI backend
 
 # === Define the Backend API URL ===
 API_URL = "http://127.0.0.1:8000"  # Change this if deployed online
+client = get_client(API_URL)  # Shared across reruns: keep-alive connections and cached responses
 
 # === Set up the Streamlit App UI ===
 st.set_page_config(page_title="EdTech Adaptive Learning Platform", layout="centered")
@@ -46,8 +47,12 @@ if menu == "Submit Learning Data":
             "feedback": feedback,
             "rating": rating
         }
-        res = requests.post(f"{API_URL}/submit_data", json=payload)  # Send POST request
-        st.success(res.json().get("message"))  # Show success message
+        res = client.post("/submit_data", json_body=payload)  # Send POST request (never retried)
+        if res.status_code == 200:
+            client.clear_cache()  # New data changes recommendations and assessments
+            st.success(res.json().get("message"))  # Show success message
+        else:
+            st.error("Could not submit data.")
 
 # === 2. Get Personalized Topic Recommendations ===
 elif menu == "Get Recommendations":
@@ -56,7 +61,7 @@ elif menu == "Get Recommendations":
 
     # On button click, request recommendations from backend
     if st.button("Get Recommendations"):
-        res = requests.get(f"{API_URL}/get_recommendations/{user_id}")
+        res = client.get(f"/get_recommendations/{user_id}")
         if res.status_code == 200:
             data = res.json()
             st.write("### Recommended Topics:")
@@ -71,7 +76,7 @@ elif menu == "Adaptive Assessment":
 
     # On button click, request assessment from backend
     if st.button("Generate Assessment"):
-        res = requests.get(f"{API_URL}/adaptive_assessment/{user_id}")
+        res = client.get(f"/adaptive_assessment/{user_id}")
         if res.status_code == 200:
             data = res.json()
             st.write(f"### Level: {data.get('assessment_level')}")  # Show level
@@ -88,7 +93,7 @@ elif menu == "Feedback Analyzer":
 
     # When user clicks analyze, send feedback to FastAPI
     if st.button("Analyze Sentiment"):
-        res = requests.post(f"{API_URL}/analyze_feedback", json={"feedback": feedback})
+        res = client.post("/analyze_feedback", json_body={"feedback": feedback}, cache=True)
         if res.status_code == 200:
             sentiment = res.json().get("feedback_sentiment")  # Get label and score
             st.write(f"**Label:** {sentiment['label']}, **Score:** {round(sentiment['score'], 2)}")
@@ -102,7 +107,7 @@ elif menu == "Chatbot Tutor":
 
     # When user types question and clicks ask, send it to the backend
     if st.button("Ask"):
-        res = requests.post(f"{API_URL}/chatbot", json={"query": query})
+        res = client.post("/chatbot", json_body={"query": query})
         if res.status_code == 200:
             reply = res.json().get("reply")  # Get response
             st.write("### Tutor Response:")
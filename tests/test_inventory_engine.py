@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from inventory_engine import build_forecast_matrix, build_params, optimize_catalog
+
+
+def forecast_rows(product_id, start, yhat):
+    dates = pd.date_range(start, periods=len(yhat), freq="D")
+    return [{"product_id": product_id, "ds": ds, "yhat": value} for ds, value in zip(dates, yhat)]
+
+
+def test_forecasts_with_different_start_dates_align_by_horizon_step():
+    rows = forecast_rows("P001", "2024-03-01", [10.0] * 30) + forecast_rows("P002", "2024-03-10", [10.0] * 30)
+
+    matrix = build_forecast_matrix(rows)
+
+    assert list(matrix.columns) == list(range(1, 31))
+    assert not matrix.isna().any().any()
+
+
+def test_catalog_plan_matches_single_product_plan_for_later_forecast():
+    rows = forecast_rows("P001", "2024-03-01", np.linspace(5, 15, 30)) + \
+        forecast_rows("P002", "2024-03-10", np.linspace(8, 12, 30))
+    inventory = pd.Series({"P001": 40.0, "P002": 40.0})
+
+    catalog = optimize_catalog(build_forecast_matrix(rows), inventory, build_params(["P001", "P002"]))
+    single = optimize_catalog(build_forecast_matrix([row for row in rows if row["product_id"] == "P002"]),
+                              inventory, build_params(["P002"]))
+
+    np.testing.assert_allclose(catalog.loc["P002", "reorder_point"], single.loc["P002", "reorder_point"])
+    lead_time_demand = np.linspace(8, 12, 30)[:5].sum()
+    assert catalog.loc["P002", "reorder_point"] > lead_time_demand
+
+
+def test_latest_run_is_kept_per_product():
+    old = [dict(row, created_at=1) for row in forecast_rows("P001", "2024-03-01", [100.0] * 5)]
+    new = [dict(row, created_at=2) for row in forecast_rows("P001", "2024-03-02", [1.0] * 5)]
+
+    matrix = build_forecast_matrix(old + new)
+
+    assert matrix.loc["P001"].tolist() == [1.0] * 5
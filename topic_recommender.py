@@ -0,0 +1,163 @@
+# === Import Required Libraries ===
+import threading            # Lock so recommendations can be served while new events arrive
+import numpy as np          # Dense similarity matrix and vectorized top-k
+import scipy.sparse as sp   # Sparse user x topic interaction matrix
+
+# === Interaction Weights ===
+# How much each signal contributes to a user's interest in a topic (each scaled to 0..1)
+SCORE_WEIGHT = 0.5     # quiz_score / 100
+TIME_WEIGHT = 0.3      # time_spent / MAX_TIME_SPENT (capped)
+RATING_WEIGHT = 0.2    # rating / 5
+MAX_TIME_SPENT = 120   # Minutes; longer sessions count the same as 120
+
+def interaction_weight(event):
+    score = (event.get("quiz_score") or 0) / 100
+    time_spent = min(event.get("time_spent") or 0, MAX_TIME_SPENT) / MAX_TIME_SPENT
+    rating = (event.get("rating") or 0) / 5
+    return SCORE_WEIGHT * score + TIME_WEIGHT * time_spent + RATING_WEIGHT * rating
+
+def _grow_csr(matrix, shape):
+    # Pads a CSR matrix with empty rows/columns (existing entries are untouched)
+    if matrix.shape == shape:
+        return matrix
+    extra_rows = shape[0] - matrix.shape[0]
+    indptr = np.concatenate([matrix.indptr, np.full(extra_rows, matrix.indptr[-1], dtype=matrix.indptr.dtype)])
+    return sp.csr_matrix((matrix.data, matrix.indices, indptr), shape=shape)
+
+def _grow_square(array, size):
+    # Pads a square dense matrix with zero rows/columns
+    extra = size - array.shape[0]
+    return np.pad(array, ((0, extra), (0, extra))) if extra else array
+
+# === Item-Item Topic Recommender ===
+# X is a sparse users x topics matrix of interaction weights. Topic-topic cosine similarity
+# S is derived from the Gram matrix G = X^T X. When new events (delta D) arrive,
+# G += X^T D + D^T X + D^T D, which only touches topics in D, so S is refreshed for
+# those rows/columns only. A user's scores are x_u @ S (one sparse-dense product),
+# and top-k uses argpartition instead of a full sort.
+class TopicRecommender:
+
+    def __init__(self):
+        self.user_rows = {}        # user_id -> row in the matrix
+        self.topic_cols = {}       # topic -> column in the matrix
+        self.topics = []           # column -> topic
+        self.matrix = sp.csr_matrix((0, 0))
+        self.gram = np.zeros((0, 0))                       # X^T X
+        self.similarity = np.zeros((0, 0), dtype=np.float32)
+        self.popularity = np.zeros(0)                      # Total interaction weight per topic
+        self.lock = threading.Lock()
+
+    # Add new learning events (dicts with user_id / topic / quiz_score / time_spent / rating)
+    def add_events(self, events):
+        with self.lock:
+            rows, cols, weights = [], [], []
+            for event in events:
+                user_id = int(event["user_id"])
+                if user_id not in self.user_rows:
+                    self.user_rows[user_id] = len(self.user_rows)
+                topic = event["topic"]
+                if topic not in self.topic_cols:
+                    self.topic_cols[topic] = len(self.topics)
+                    self.topics.append(topic)
+                rows.append(self.user_rows[user_id])
+                cols.append(self.topic_cols[topic])
+                weights.append(interaction_weight(event))
+            if not rows:
+                return
+
+            shape = (len(self.user_rows), len(self.topics))
+            delta = sp.csr_matrix((weights, (rows, cols)), shape=shape)  # Repeated pairs are summed
+            old = _grow_csr(self.matrix, shape)
+
+            # Incremental Gram update: only entries with a topic from delta change
+            self.gram = _grow_square(self.gram, shape[1])
+            cross = old.T @ delta
+            update = (cross + cross.T + delta.T @ delta).tocoo()
+            np.add.at(self.gram, (update.row, update.col), update.data)
+
+            self.matrix = (old + delta).tocsr()
+            self.popularity = np.pad(self.popularity, (0, shape[1] - len(self.popularity)))
+            self.popularity += np.asarray(delta.sum(axis=0)).ravel()
+            self._refresh_similarity(np.unique(delta.indices))
+
+    def _refresh_similarity(self, changed):
+        # Recompute cosine similarity rows/columns for the changed topics only
+        self.similarity = _grow_square(self.similarity, len(self.topics))
+        norms = np.sqrt(np.diag(self.gram))
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        block = self.gram[changed, :] * inverse[changed, None] * inverse[None, :]
+        self.similarity[changed, :] = block
+        self.similarity[:, changed] = block.T
+        self.similarity[changed, changed] = 0  # A topic is not its own recommendation
+
+    # Top-k unseen topics for many users at once; unknown users map to None
+    def recommend_many(self, user_ids, k=3):
+        with self.lock:
+            results = {user_id: None for user_id in user_ids}
+            known = [user_id for user_id in user_ids if user_id in self.user_rows]
+            if not known or not self.topics:
+                return results
+            if k < 1:
+                return {**results, **{user_id: [] for user_id in known}}
+
+            user_matrix = self.matrix[[self.user_rows[user_id] for user_id in known]]
+            scores = np.asarray(user_matrix @ self.similarity, dtype=np.float64)
+            # Popularity breaks ties (and ranks topics for users with no similar topics)
+            scores += 1e-6 * self.popularity / (self.popularity.max() or 1)
+
+            # Hide topics the user has already studied, unless they have studied everything
+            masked = scores.copy()
+            seen_rows, seen_cols = user_matrix.nonzero()
+            masked[seen_rows, seen_cols] = -np.inf
+            all_seen = np.isneginf(masked).all(axis=1)
+            masked[all_seen] = scores[all_seen]
+
+            # argpartition finds the k best in O(topics); only those k are then sorted
+            k = min(k, len(self.topics))
+            top = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(masked, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for user_id, columns, column_scores in zip(known, top, top_scores):
+                results[user_id] = [
+                    self.topics[column] for column, score in zip(columns, column_scores) if np.isfinite(score)
+                ]
+            return results
+
+    def recommend(self, user_id, k=3):
+        return self.recommend_many([user_id], k)[user_id]
+
+# === Run the Script as a Benchmark ===
+# Synthetic 100k users x 1k topics, ~20 events per user; reports single-user and batch top-k latency
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_users, n_topics, events_per_user = 100_000, 1_000, 20
+    users = np.repeat(np.arange(n_users), events_per_user)
+    topic_ids = rng.integers(0, n_topics, size=users.size)
+    events = [
+        {"user_id": int(u), "topic": f"topic_{t}", "quiz_score": int(s), "time_spent": int(m), "rating": int(r)}
+        for u, t, s, m, r in zip(users, topic_ids, rng.integers(0, 101, users.size),
+                                 rng.integers(5, 121, users.size), rng.integers(1, 6, users.size))
+    ]
+
+    recommender = TopicRecommender()
+    start = time.perf_counter()
+    recommender.add_events(events)
+    print(f"Built index for {len(events)} events in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for user_id in range(1_000):
+        recommender.recommend(user_id, k=5)
+    print(f"Single-user top-5: {(time.perf_counter() - start):.3f} ms per user")
+
+    start = time.perf_counter()
+    recommender.recommend_many(list(range(10_000)), k=5)
+    print(f"Batch top-5 for 10k users: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    recommender.add_events(events[:100])
+    print(f"Incremental refresh for 100 new events: {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -1,8 +1,11 @@
 import streamlit as st  # Importing Streamlit for building the dashboard
-import requests  # To send HTTP requests to our FastAPI backend
+from api_client import get_client  # Pooled, cached HTTP client for our FastAPI backend
 import pandas as pd  # For working with tabular data
 import plotly.express as px  # For creating interactive plots
 
+API_URL = "http://localhost:8000"  # FastAPI backend
+client = get_client(API_URL)  # Shared across reruns: keep-alive connections and cached responses
+
 # === Streamlit App ===
 st.set_page_config(page_title="Supply Chain Dashboard", layout="wide")  # Configuring the page title and layout
 st.title("📦 Supply Chain Analytics Dashboard")  # Setting the main title of the dashboard
@@ -11,26 +14,82 @@ st.title("📦 Supply Chain Analytics Dashboard")  # Setting the main title of t
 st.sidebar.header("Filter")  # Sidebar section header
 product_id = st.sidebar.text_input("Enter Product ID")  # User input for product ID
 
-# Section to show complete sales data from MongoDB
+# Section to show sales data from MongoDB, one page at a time
 st.subheader("📊 All Sales Data")  # Section header
-if st.button("Load All Data"):  # Button to trigger data load
-    response = requests.get("http://localhost:8000/all_data")  # Send GET request to FastAPI to fetch all data
+def first_page():
+    """Starts the table over at the first page (on load, or when the page size or region changes)."""
+    st.session_state.page_after_id = None
+    st.session_state.next_after_id = None
+
+def load_first_page():
+    first_page()
+    st.session_state.show_sales = True
+
+def next_page():
+    st.session_state.page_after_id = st.session_state.next_after_id  # Continue after the last row we saw
+
+if "show_sales" not in st.session_state:  # Paging state, kept across reruns
+    st.session_state.show_sales = False
+    first_page()
+
+page_size = st.number_input("Rows per page", min_value=100, max_value=10000, value=1000, step=100,
+                            on_change=first_page)  # Page size
+region_filter = st.sidebar.text_input("Region (optional)", on_change=first_page)  # Optional region filter
+
+st.button("Load All Data", on_click=load_first_page)  # Button to load the first page
+if st.session_state.show_sales:
+    params = {"limit": page_size}  # Only fetch one page of rows
+    if st.session_state.page_after_id:
+        params["after_id"] = st.session_state.page_after_id
+    if region_filter:
+        params["region"] = region_filter
+    response = client.get("/all_data", params=params)  # Send GET request to FastAPI
     if response.status_code == 200:  # Check if request was successful
+        st.session_state.next_after_id = response.headers.get("X-Next-After-Id")  # None on the last page
         data = response.json()  # Convert response to JSON
         df = pd.DataFrame(data)  # Convert JSON to pandas DataFrame
         st.dataframe(df)  # Display data in a scrollable table
-        # Optional: Plot sales by product
-        if "product_id" in df.columns and "sales_quantity" in df.columns:  # Check if necessary columns exist
-            fig = px.bar(df, x="product_id", y="sales_quantity", title="Total Sales by Product")  # Bar chart
-            st.plotly_chart(fig, use_container_width=True)  # Display the chart full width
+        if st.session_state.next_after_id:
+            st.button("Next Page", on_click=next_page)  # Rendered after the fetch that set the cursor
     else:
         st.error("Failed to load data")  # Show error if API call fails
 
+# Section with sales summaries aggregated by the backend (one row per group, not per sale)
+st.subheader("📊 Sales Summary")  # Section header
+granularity = st.selectbox("Time granularity", ["day", "week", "month"], index=2)  # Period for the trend chart
+if st.button("Load Summary"):  # Button to trigger the aggregation requests
+    summary_params = {"region": region_filter} if region_filter else {}  # Reuse the sidebar region filter
+    summary = client.fetch_many({  # The three aggregations are fetched in parallel
+        "by_product": ("GET", "/sales/by_product", {"params": summary_params}),  # Totals per product
+        "by_region": ("GET", "/sales/by_region", {}),  # Totals per region
+        "over_time": ("GET", "/sales/over_time", {"params": {**summary_params, "granularity": granularity}}),
+    })
+    by_product, by_region, over_time = summary["by_product"], summary["by_region"], summary["over_time"]
+    if all(r.status_code == 200 for r in (by_product, by_region, over_time)):  # All requests succeeded
+        col1, col2 = st.columns(2)  # Two charts side by side
+        with col1:
+            fig = px.bar(pd.DataFrame(by_product.json()), x="product_id", y="total_sales",
+                         title="Total Sales by Product")  # Bar chart per product
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            fig = px.bar(pd.DataFrame(by_region.json()), x="region", y="total_sales",
+                         title="Total Sales by Region")  # Bar chart per region
+            st.plotly_chart(fig, use_container_width=True)
+        fig = px.line(pd.DataFrame(over_time.json()), x="period", y="total_sales",
+                      title=f"Total Sales per {granularity.capitalize()}")  # Trend line
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.error("Failed to load summary")  # Show error if any API call fails
+
 # Section to forecast demand using Prophet model
 st.subheader("📈 Forecast Demand")  # Section header
 if product_id and st.button("Get Forecast"):
-    url = f"http://localhost:8000/forecast/{product_id}"  # Construct API URL with product ID
-    response = requests.get(url)  # Send GET request to FastAPI
+    # Inventory is fetched alongside the forecast, so "Optimize Inventory" is then served from cache
+    responses = client.fetch_many({
+        "forecast": ("GET", f"/forecast/{product_id}", {}),
+        "inventory": ("GET", f"/inventory_optimize/{product_id}", {}),
+    })
+    response = responses["forecast"]
     if response.status_code == 200:  # If response is successful
         forecast_data = response.json()  # Load JSON data
         forecast_df = pd.DataFrame(forecast_data)  # Convert to DataFrame
@@ -46,8 +105,7 @@ if product_id and st.button("Get Forecast"):
 # Section for Inventory Optimization using Reorder Point strategy
 st.subheader("📦 Inventory Optimization")  # Section header
 if product_id and st.button("Optimize Inventory"):
-    url = f"http://localhost:8000/inventory_optimize/{product_id}"  # Construct API URL with product ID
-    response = requests.get(url)  # Send GET request
+    response = client.get(f"/inventory_optimize/{product_id}")  # Send GET request (cached for a short TTL)
     if response.status_code == 200:  # If request was successful
         result = response.json()  # Parse response JSON
         st.json(result)  # Display result in JSON format in the UI
@@ -58,7 +116,7 @@ if product_id and st.button("Optimize Inventory"):
 st.subheader("💬 Market Sentiment Analysis")  # Section header
 market_text = st.text_area("Enter market news or customer feedback")  # Text input area for user
 if market_text and st.button("Analyze Market Trend"):
-    response = requests.post("http://localhost:8000/market_analysis", params={"text": market_text})  # Send POST request with text
+    response = client.post("/market_analysis", params={"text": market_text}, cache=True)  # Same text, same answer
     if response.status_code == 200:  # If request was successful
         result = response.json()  # Parse response JSON
         st.write("**Sentiment:**", result["sentiment"])  # Show sentiment